@@ -24,10 +24,16 @@
 import logging
 import sys
 import time
+import math
 import re
+import os
 import json
 import serial
 import threading
+import queue
+import itertools
+import collections
+import contextlib
 from datetime import datetime
 import dateutil.parser
 import cherrypy
@@ -41,13 +47,22 @@ if __name__ == '__main__':
     class SmartPluginWebIf():
         pass
 
-    import os
     BASE = os.path.sep.join(os.path.realpath(__file__).split(os.path.sep)[:-3])
     sys.path.insert(0, BASE)
     import commands
+    from locking import FairLock, RequestCancelled
+    from metrics import ViessmannMetrics, ViessmannProfiler
+    from history import HistoryRing, CounterRate, HistoryFile, read_history
+    from capture import CaptureSerial, ReplaySerial
+    from scanner import AddressScanner
 
 else:
     from . import commands
+    from .locking import FairLock, RequestCancelled
+    from .metrics import ViessmannMetrics, ViessmannProfiler
+    from .history import HistoryRing, CounterRate, HistoryFile, read_history
+    from .capture import CaptureSerial, ReplaySerial
+    from .scanner import AddressScanner
 
     from lib.item import Items
     from lib.model.smartplugin import SmartPlugin, SmartPluginWebIf, Modules
@@ -66,6 +81,15 @@ class Viessmann(SmartPlugin):
 
     PLUGIN_VERSION = '1.2.2'
 
+    FAULT_LOG_SIZE = 100
+
+    # connection states
+    DISCONNECTED = 'disconnected'
+    CONNECTING = 'connecting'
+    INITIALIZING = 'initializing'
+    READY = 'ready'
+    FAILED = 'failed'
+
 #
 # public methods
 #
@@ -76,6 +100,13 @@ class Viessmann(SmartPlugin):
         if standalone:
             self._serialport = standalone
             self._timeout = 3
+            self._request_timeout = 0
+            self._default_maxage = 0
+            self._profiling = False
+            self._capture_file = ''
+            self._history_size = 0
+            self._history_filename = ''
+            self._fault_log_gated = False
             self.logger = logger
             self._standalone = True
 
@@ -85,6 +116,15 @@ class Viessmann(SmartPlugin):
             self._heating_type = self.get_parameter_value('heating_type')
             self._protocol = self.get_parameter_value('protocol')
             self._timeout = self.get_parameter_value('timeout')
+            self._request_timeout = self.get_parameter_value('request_timeout')
+            self._default_maxage = self.get_parameter_value('read_maxage')
+            self._profiling = self.get_parameter_value('profiling')
+            self._capture_file = self.get_parameter_value('capture_file')
+            self._history_size = self.get_parameter_value('history_size')
+            self._history_filename = self.get_parameter_value('history_file')
+            self._history_file_size = self.get_parameter_value('history_file_size')
+            self._history_file_count = self.get_parameter_value('history_file_count')
+            self._fault_log_gated = self.get_parameter_value('fault_log_gated')
             self._standalone = False
 
         # Set variables
@@ -95,16 +135,43 @@ class Viessmann(SmartPlugin):
         self._application_timer = {}                                        # Dict of application timer with command codes and values
         self._timer_cmds = []                                               # List of command codes for timer
         self._viess_timer_dict = {}
-        self._last_values = {}
-        self._balist_item = None                                # list of last value per command code
-        self._lock = threading.Lock()
+        self._last_values = {}                                              # Dict of last value per command code
+        self._last_values_time = {}                                         # Dict of last read time per command code, 0 after a write
+        self._last_values_seq = {}                                          # Dict of sequence number of last value change per command code
+        self._value_seq = 0                                                 # Sequence number of last value change
+        self._value_lock = threading.Lock()
+        self._read_maxage = {}                                              # Dict of command codes with max age of cached values for manual reads
+        self._cache_stats = {'hits': 0, 'misses': 0}
+        self._metrics = ViessmannMetrics()                                  # Per-command counters and latency histograms
+        self._metric_items = {}                                             # Dict of metric names with items to mirror metric values to
+        self._rate_items = {}                                               # Dict of command codes with items for rates of counter values
+        self._fault_log = []                                                # List of decoded error history entries, newest first
+        self._fault_log_items = []                                          # List of items to receive the fault log
+        self._fault_entries = {}                                            # Dict of error command codes with last read error code and time
+        self._fault_commandcodes = [None]                                   # Addresses of error entries, newest first
+        self._fault_fetch_pending = False                                   # Read all error entries on next cyclic run
+        self._bus_budget = {}                                               # Result of bus time planning for cyclic reads
+        self._profiler = ViessmannProfiler()
+        self._scanner = None
+        self._history = {}                                                  # Dict of command codes with history of numeric values
+        self._history_file = None                                           # Writer for persistent history of numeric values
+        if self._history_filename:
+            self._history_file = HistoryFile(self._history_filename, self._history_file_size * 1024 * 1024, self._history_file_count, self.logger)
+        self._balist_item = None
+        self._lock = FairLock()                                             # Serializes all access to the serial device
+        self._serial = None
+        self._state = self.DISCONNECTED                                     # Connection state, changed only while holding self._lock
+        self._failed_time = 0                                               # Time of last failed connection or initialization attempt
+        self._stop_event = threading.Event()                                # Set on stop to cancel running and waiting requests
+        self._request = threading.local()                                   # Deadline of the current request per thread
         self._initread = False
         self._timerread = False
-        self._connected = False
-        self._initialized = False
         self._lastbyte = b''
         self._lastbytetime = 0
         self._cyclic_update_active = False
+        self._pending_writes = {}                                           # Dict of command names with values waiting to be written
+        self._verify_reads = {}                                             # Dict of command names with scheduled verification reads
+        self._write_lock = threading.Lock()
         self._wochentage = {
             'MO': ['mo', 'montag', 'monday'],
             'TU': ['di', 'dienstag', 'tuesday'],
@@ -113,6 +180,11 @@ class Viessmann(SmartPlugin):
             'FR': ['fr', 'freitag', 'friday'],
             'SA': ['sa', 'samstag', 'saturday'],
             'SU': ['so', 'sonntag', 'sunday']}
+        self._weekday_lookup = {name: weekday for weekday in self._wochentage for name in self._wochentage[weekday]}
+        self._timer_changed = set()                                         # Set of timer applications with changed timer values
+
+        if self._profiling:
+            self._init_profiling()
 
         # if running standalone, don't initialize command sets
         if not sh:
@@ -137,7 +209,9 @@ class Viessmann(SmartPlugin):
         if not self._config_loaded:
             if not self._load_configuration():
                 return
+        self._stop_event.clear()
         self.alive = True
+        self._plan_bus_budget()
         self._connect()
         self._read_initial_values()
         self._read_timers()
@@ -147,8 +221,23 @@ class Viessmann(SmartPlugin):
         Stop method for the plugin
         '''
         self.alive = False
+        # cancel running requests and wake up requests waiting for the serial device
+        self._stop_event.set()
+        self._lock.interrupt()
         if self.scheduler_get('cyclic'):
             self.scheduler_remove('cyclic')
+        with self._write_lock:
+            for commandname in self._pending_writes:
+                self.logger.warning(f'Discarding pending value {self._pending_writes[commandname]["value"]} for command {commandname}')
+                self._pending_writes[commandname]['timer'].cancel()
+            self._pending_writes = {}
+            for timer in self._verify_reads.values():
+                timer.cancel()
+            self._verify_reads = {}
+        if self._scanner:
+            self._scanner.stop()
+        if self._history_file:
+            self._history_file.close()
         self._disconnect()
         # force reload of configuration on restart
         self._config_loaded = False
@@ -169,6 +258,51 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Item for requesting update for all items triggered: {item}')
             return self.update_item
 
+        # Process the metric config
+        if self.has_iattr(item.conf, 'viess_metric'):
+            metric = self.get_iattr_value(item.conf, 'viess_metric')
+            self.logger.debug(f'Item {item} mirrors metric {metric}')
+            self._metric_items.setdefault(metric, []).append(item)
+            return None
+
+        # Process the fault log config
+        if self.has_iattr(item.conf, 'viess_fault_log'):
+            self.logger.debug(f'Item {item} receives fault log')
+            self._fault_log_items.append(item)
+            # continue cached fault log
+            if not self._fault_log and isinstance(item(), list):
+                self._fault_log = [entry for entry in item() if isinstance(entry, dict) and 'code' in entry]
+            return None
+
+        # Process the rate config
+        if self.has_iattr(item.conf, 'viess_rate'):
+            commandname = self.get_iattr_value(item.conf, 'viess_rate')
+            if commandname not in self._commandset:
+                self.logger.error(f'Item {item} contains invalid rate command {commandname}!')
+                return None
+            commandconf = self._commandset[commandname]
+            commandcode = (commandconf['addr']).lower()
+
+            unit = 'hour'
+            if self.has_iattr(item.conf, 'viess_rate_unit'):
+                unit = self.get_iattr_value(item.conf, 'viess_rate_unit')
+            if unit not in CounterRate.UNITS:
+                self.logger.error(f'Item {item} contains invalid rate unit {unit}!')
+                return None
+            window = 3600
+            if self.has_iattr(item.conf, 'viess_rate_window'):
+                window = float(self.get_iattr_value(item.conf, 'viess_rate_window'))
+
+            # counter wraps around after the maximum raw value for the data length
+            modulo = 2 ** (8 * commandconf['len'])
+            transform = self._unitset.get(commandconf['unit'], {}).get('read_value_transform')
+            if self._isfloat(transform):
+                modulo /= float(transform)
+
+            self.logger.info(f'Item {item} receives rate of command {commandname} per {unit} over {window} seconds')
+            self._rate_items.setdefault(commandcode, []).append({'item': item, 'factor': CounterRate.UNITS[unit], 'rate': CounterRate(window, modulo)})
+            return None
+
         # Process the timer config and fill timer dict
         if self.has_iattr(item.conf, 'viess_timer'):
             timer_app = self.get_iattr_value(item.conf, 'viess_timer')
@@ -179,7 +313,7 @@ class Viessmann(SmartPlugin):
                     # {'addr': '2100', 'len': 8, 'unit': 'CT', 'set': True}
                     commandcode = (commandconf['addr']).lower()
                     if timer_app not in self._application_timer:
-                        self._application_timer[timer_app] = {'item': item, 'commandcodes': []}
+                        self._application_timer[timer_app] = {'item': item, 'commandcodes': [], 'blockread': True}
                     if commandcode not in self._application_timer[timer_app]['commandcodes']:
                         self._application_timer[timer_app]['commandcodes'].append(commandcode)
                     self._application_timer[timer_app]['commandcodes'].sort()
@@ -218,7 +352,9 @@ class Viessmann(SmartPlugin):
                 self.logger.debug(f'CommandCodes should be read at init: {self._init_cmds}')
 
             # Allow items to be cyclically updated
-            if self.has_iattr(item.conf, 'viess_read_cycle'):
+            if self.has_iattr(item.conf, 'viess_read_cycle') and self._fault_log_gated and commandconf['unit'] == 'ES' and commandcode != self._get_fault_commandcodes()[0]:
+                self.logger.info(f'Item {item} is only read when the newest error entry changes')
+            elif self.has_iattr(item.conf, 'viess_read_cycle'):
                 cycle = int(self.get_iattr_value(item.conf, 'viess_read_cycle'))
                 self.logger.info(f'Item {item} should read cyclic every {cycle} seconds')
                 nexttime = time.time() + cycle
@@ -230,6 +366,12 @@ class Viessmann(SmartPlugin):
                         self._cyclic_cmds[commandcode]['cycle'] = cycle
                 self.logger.debug(f'CommandCodes should be read cyclic: {self._cyclic_cmds}')
 
+            # Allow manual reads to use cached values up to the given age
+            if self.has_iattr(item.conf, 'viess_read_maxage'):
+                maxage = float(self.get_iattr_value(item.conf, 'viess_read_maxage'))
+                self.logger.info(f'Item {item} allows cached values for manual reads up to {maxage} seconds old')
+                self._read_maxage[commandcode] = maxage
+
         # Process the write config
         if self.has_iattr(item.conf, 'viess_send'):
             if self.get_iattr_value(item.conf, 'viess_send'):
@@ -273,40 +415,14 @@ class Viessmann(SmartPlugin):
                     commandname = self.get_iattr_value(item.conf, 'viess_send')
                 value = item()
                 self.logger.debug(f'Got item value to be written: {value} on command name {commandname}')
-                if not self._send_command(commandname, value):
-                    # create_write_command() liefert False, wenn das Schreiben fehlgeschlagen ist
-                    # -> dann auch keine weitere Verarbeitung
-                    self.logger.debug(f'Write for {commandname} with value {value} failed, reverting value, canceling followup actions')
-                    item(item.property.last_value, self.get_shortname())
-                    return None
+                # Wait for further changes if configured, only the last value is written
+                if self.has_iattr(item.conf, 'viess_send_coalesce'):
+                    window = float(self.get_iattr_value(item.conf, 'viess_send_coalesce'))
+                    if window > 0:
+                        self._queue_write(item, commandname, value, window)
+                        return None
 
-                # If a read command should be sent after write
-                if self.has_iattr(item.conf, 'viess_read') and self.has_iattr(item.conf, 'viess_read_afterwrite'):
-                    readcommandname = self.get_iattr_value(item.conf, 'viess_read')
-                    readafterwrite = self.get_iattr_value(item.conf, 'viess_read_afterwrite')
-                    self.logger.debug(f'Attempting read after write for item {item}, command {readcommandname}, delay {readafterwrite}')
-                    if readcommandname is not None and readafterwrite is not None:
-                        aw = float(readafterwrite)
-                        time.sleep(aw)
-                        self._send_command(readcommandname)
-
-                # If commands should be triggered after this write
-                if self.has_iattr(item.conf, 'viess_trigger'):
-                    trigger = self.get_iattr_value(item.conf, 'viess_trigger')
-                    if trigger is None:
-                        self.logger.error(f'Item {item} contains invalid trigger command list {trigger}!')
-                    else:
-                        tdelay = 5  # default delay
-                        if self.has_iattr(item.conf, 'viess_trigger_afterwrite'):
-                            tdelay = float(self.get_iattr_value(item.conf, 'viess_trigger_afterwrite'))
-                        if type(trigger) != list:
-                            trigger = [trigger]
-                        for triggername in trigger:
-                            triggername = triggername.strip()
-                            if triggername is not None and readafterwrite is not None:
-                                self.logger.debug(f'Triggering command {triggername} after write for item {item}')
-                                time.sleep(tdelay)
-                                self._send_command(triggername)
+                self._write_item_value(item, commandname, value, item.property.last_value)
 
             elif self.has_iattr(item.conf, 'viess_timer'):
                 timer_app = self.get_iattr_value(item.conf, 'viess_timer')
@@ -362,10 +478,15 @@ class Viessmann(SmartPlugin):
                 entry['nexttime'] = currenttime + entry['cycle']
                 read_items += 1
 
+        if self._fault_fetch_pending:
+            self._read_fault_entries()
+
         self._cyclic_update_active = False
         if read_items:
             self.logger.debug(f'cyclic command read took {(time.time() - currenttime):.1f} seconds for {read_items} items')
 
+        self._update_metric_items()
+
     def update_all_read_items(self):
         '''
         Read all values preset in commands.py as readable
@@ -375,12 +496,166 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Triggering read command: {commandname} for requested value update')
             self._send_command(commandname)
 
-    def read_addr(self, addr):
+    def get_metrics(self, commandname=None):
+        '''
+        Return counters and latency histograms
+
+        :param commandname: only return metrics for this command
+        :type commandname: str
+        :return: dict of metrics, see ViessmannMetrics.snapshot()
+        :rtype: dict
+        '''
+        metrics = self._metrics.snapshot()
+        if commandname is not None:
+            metrics['commands'] = {commandname: metrics['commands'].get(commandname)}
+        return metrics
+
+    def reset_metrics(self):
+        '''
+        Reset all counters and latency histograms
+        '''
+        self._metrics.reset()
+        self._update_metric_items()
+
+    def start_scan(self, start='0000', end='ffff', length=2, blocksize=16, bus_share=0.25, filename=None):
+        '''
+        Start scanning an address range in the background for datapoints answering with plausible data.
+        If a scan of the same range was interrupted, it is resumed.
+
+        :param start: first address (four-digit hex)
+        :type start: str
+        :param end: last address (four-digit hex)
+        :type end: str
+        :param length: number of bytes per datapoint
+        :type length: int
+        :param blocksize: number of bytes to read at once
+        :type blocksize: int
+        :param bus_share: maximum share of bus time to use for scanning
+        :type bus_share: float
+        :param filename: file to save progress to, defaults to var/viessmann_scan.json in the SmartHomeNG directory
+        :type filename: str
+        :return: True if scan was started, False otherwise
+        :rtype: bool
+        '''
+        if self._scanner and self._scanner.running:
+            self.logger.warning('Address scan is already running')
+            return False
+
+        try:
+            start = int(start, 16)
+            end = int(end, 16)
+        except ValueError:
+            self.logger.error(f'Invalid address range {start}-{end} for address scan')
+            return False
+        if not 0 <= start <= end <= 0xffff or not 1 <= int(length) <= 8:
+            self.logger.error(f'Invalid address range {start:04x}-{end:04x} or length {length} for address scan')
+            return False
+
+        if filename is None:
+            filename = os.path.join(self.get_sh().get_basedir(), 'var', 'viessmann_scan.json')
+        self._scanner = AddressScanner(self, filename, start, end, int(length), int(blocksize), float(bus_share))
+        self._scanner.start()
+        return True
+
+    def stop_scan(self):
+        '''
+        Stop running address scan, progress is kept for resuming
+        '''
+        if self._scanner:
+            self._scanner.stop()
+
+    def get_scan_status(self):
+        '''
+        Return progress and results of the current or last address scan
+
+        :return: dict with scan range, progress, found addresses and state
+        :rtype: dict
+        '''
+        if self._scanner is None:
+            return {}
+        return self._scanner.status()
+
+    def get_profile(self, reset=False):
+        '''
+        Return timing of profiled methods, only available if profiling is enabled
+
+        :param reset: clear collected timings after returning them
+        :type reset: bool
+        :return: dict of span names with count, total, avg and max duration in ms
+        :rtype: dict
+        '''
+        return self._profiler.aggregate(reset)
+
+    def get_fault_log(self):
+        '''
+        Return error history collected from all reads of error entries (unit ES)
+
+        :return: list of dicts with error code, text, time of error and time of first read, newest first
+        :rtype: list
+        '''
+        with self._value_lock:
+            return [dict(entry) for entry in self._fault_log]
+
+    def get_history(self, addr, window=0, points=0):
+        '''
+        Return history of numeric values read from a data point, only available if history_size is set
+
+        :param addr: data point addr (2 byte hex address)
+        :type addr: str
+        :param window: only return values of the last window seconds, 0 for all values
+        :type window: float
+        :param points: downsample to at most this number of averaged values, 0 for all values
+        :type points: int
+        :return: dict with count, min, max and mean of values in window and lists of times and values
+        :rtype: dict
+        '''
+        addr = addr.lower()
+        start = time.time() - window if window else None
+        with self._value_lock:
+            history = self._history.get(addr)
+            if history is None:
+                return {}
+            result = history.stats(start)
+            if points:
+                (times, values) = history.downsample(points, start)
+            else:
+                (times, values) = history.window(start)
+        result.update({'addr': addr, 'cmd': self._commandname_by_commandcode(addr), 'times': list(times), 'values': list(values)})
+        return result
+
+    def read_history_file(self, start=None, end=None, addr=None):
+        '''
+        Return values recorded in history_file and its rotated predecessors
+
+        :param start: start of time range in seconds since epoch, None for oldest value
+        :type start: float
+        :param end: end of time range in seconds since epoch, None for newest value
+        :type end: float
+        :param addr: only return values of this data point addr (2 byte hex address)
+        :type addr: str
+        :return: list of [timestamp, addr, value]
+        :rtype: list
+        '''
+        if self._history_file is None:
+            return []
+        return [[timestamp, f'{commandcode:04x}', value] for (timestamp, commandcode, value) in read_history(self._history_filename, start, end, int(addr, 16) if addr else None)]
+
+    def read_addr(self, addr, force=False, maxage=None, timeout=None):
         '''
         Tries to read a data point indepently of item config
 
+        If a value for the data point was read recently, the cached value is returned
+        instead of querying the device. The allowed age defaults to ``viess_read_maxage``
+        or ``viess_read_cycle`` of the corresponding item, or the plugin parameter ``read_maxage``.
+
         :param addr: data point addr (2 byte hex address)
         :type addr: str
+        :param force: always read from device, ignoring cached values
+        :type force: bool
+        :param maxage: maximum age of cached value in seconds, overrides configured value
+        :type maxage: float
+        :param timeout: maximum time in seconds to wait for the device including waiting for other requests, defaults to plugin parameter ``request_timeout``
+        :type timeout: float
         :return: Value if read is successful, None otherwise
         '''
         addr = addr.lower()
@@ -390,25 +665,41 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Address {addr} not defined in commandset, aborting')
             return None
 
+        if not force:
+            if maxage is None:
+                maxage = self._get_maxage(addr)
+            with self._value_lock:
+                readtime = self._last_values_time.get(addr, 0)
+                value = self._last_values.get(addr)
+                cached = maxage > 0 and time.time() - readtime <= maxage
+                self._cache_stats['hits' if cached else 'misses'] += 1
+            if cached:
+                self.logger.debug(f'Using cached value for address {addr}, read {time.time() - readtime:.1f} seconds ago')
+                return value
+
         self.logger.debug(f'Attempting to read address {addr} for command {commandname}')
 
         (packet, responselen) = self._build_command_packet(commandname)
         if packet is None:
             return None
 
-        response_packet = self._send_command_packet(packet, responselen)
+        self._metrics.count('requests', commandname)
+        with self._request_deadline(timeout):
+            response_packet = self._send_command_packet(packet, responselen, commandname)
         if response_packet is None:
+            self._metrics.count('errors', commandname)
             return None
 
         res = self._parse_response(response_packet, commandname)
         if res is None:
+            self._metrics.count('errors', commandname)
             return None
 
         (value, commandcode) = res
 
         return value
 
-    def read_temp_addr(self, addr, length, unit):
+    def read_temp_addr(self, addr, length, unit, timeout=None):
         '''
         Tries to read an arbitrary supplied data point indepently of device config
 
@@ -418,6 +709,8 @@ class Viessmann(SmartPlugin):
         :type len: num
         :param unit: Unit code from commands.py
         :type unit: str
+        :param timeout: maximum time in seconds to wait for the device, defaults to plugin parameter ``request_timeout``
+        :type timeout: float
         :return: Value if read is successful, None otherwise
         '''
         # as we have no reference whatever concerning the supplied data, we do a few sanity checks...
@@ -442,8 +735,8 @@ class Viessmann(SmartPlugin):
             return None
 
         # addr already known?
-        if addr in self._commandset:
-            cmd = self._commandname_by_commandcode(addr)
+        cmd = self._commandname_by_commandcode(addr)
+        if cmd is not None:
             self.logger.info(f'temp address {addr} already known for command {cmd}')
         else:
             # create temp commandset
@@ -452,20 +745,23 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Adding temporary command config {cmdconf} for command temp_cmd')
             self._commandset[cmd] = cmdconf
 
-        res = self.read_addr(addr)
+        # cached values of unknown addresses might have been read with different length or unit
+        res = self.read_addr(addr, force=(cmd == 'temp_cmd'), timeout=timeout)
 
         if cmd == 'temp_cmd':
             del self._commandset['temp_cmd']
 
         return res
 
-    def write_addr(self, addr, value):
+    def write_addr(self, addr, value, timeout=None):
         '''
         Tries to write a data point indepently of item config
 
         :param addr: data point addr (2 byte hex address)
         :type addr: str
         :param value: value to write
+        :param timeout: maximum time in seconds to wait for the device, defaults to plugin parameter ``request_timeout``
+        :type timeout: float
         :return: Value if read is successful, None otherwise
         '''
         addr = addr.lower()
@@ -481,16 +777,124 @@ class Viessmann(SmartPlugin):
         if packet is None:
             return None
 
-        response_packet = self._send_command_packet(packet, responselen)
+        self._metrics.count('requests', commandname)
+        with self._request_deadline(timeout):
+            response_packet = self._send_command_packet(packet, responselen, commandname)
         if response_packet is None:
+            self._metrics.count('errors', commandname)
             return None
 
         return self._parse_response(response_packet, commandname)
 
+    def write_addrs(self, values):
+        '''
+        Tries to write multiple data points indepently of item config in one go.
+        All values are checked before sending, if any value is invalid, nothing is written.
+        The values are sent back-to-back while holding the connection lock; with KW protocol,
+        only one sync is requested if the device accepts the following packets.
+
+        :param values: dict of data point addr (2 byte hex address) and value to write
+        :type values: dict
+        :return: dict of data point addr and True if write was successful, False otherwise
+        :rtype: dict
+        '''
+        results = {}
+        bulk = {}
+
+        # build and check all packets before sending anything
+        for addr, value in values.items():
+            addr = addr.lower()
+            results[addr] = False
+
+            commandname = self._commandname_by_commandcode(addr)
+            if commandname is None:
+                self.logger.error(f'Address {addr} not defined in commandset, aborting bulk write')
+                continue
+
+            (packet, responselen) = self._build_command_packet(commandname, value)
+            if packet is None:
+                self.logger.error(f'Value {value} invalid for address {addr}, aborting bulk write')
+                continue
+
+            bulk[addr] = {'packet': packet, 'responselen': responselen, 'command': commandname}
+
+        if len(bulk) != len(results):
+            return results
+
+        self.logger.debug(f'Attempting to write addresses {list(bulk.keys())} in one go')
+
+        starttime = time.time()
+        if not self._acquire_lock():
+            return results
+        try:
+            if not self._ensure_ready(starttime):
+                self._check_request()
+                raise Exception('Interface not initialized!')
+
+            synced = False
+            for addr in bulk:
+                self._check_request()
+                response = None
+                self._metrics.count('requests', bulk[addr]['command'])
+                if synced:
+                    # try to send without start byte and new sync, as KW_send_multiple_read_commands does
+                    response = self._transceive_packet(bulk[addr]['packet'][1:], bulk[addr]['responselen'], False, bulk[addr]['command'])
+                    if response == self._int2bytes(self._controlset['Not_initiated'], 1):
+                        # device is waiting for a new sync
+                        response = None
+                    if response is None and not self._connected:
+                        # reading timed out, so the connection was reset
+                        self.logger.info(f'Follow-up packet for address {addr} timed out, reconnecting before retry with new sync')
+                        if not self._ensure_ready(time.time()):
+                            self.logger.error(f'Could not reconnect after timeout on writing address {addr}, aborting bulk write')
+                            self._metrics.count('errors', bulk[addr]['command'])
+                            break
+                    elif response is None:
+                        self.logger.debug(f'Device did not accept follow-up packet for address {addr}, requesting new sync')
+                if response is None:
+                    response = self._transceive_packet(bulk[addr]['packet'], bulk[addr]['responselen'], True, bulk[addr]['command'])
+                if response is None:
+                    self.logger.error(f'No response on writing address {addr}, aborting bulk write')
+                    self._metrics.count('errors', bulk[addr]['command'])
+                    break
+
+                results[addr] = self._parse_response(response, bulk[addr]['command'], False) is True
+                if not results[addr]:
+                    self._metrics.count('errors', bulk[addr]['command'])
+                synced = self._protocol == 'KW'
+
+        except RequestCancelled as e:
+            self._request_cancelled(e)
+        except IOError as io:
+            self.logger.error(f'write_addrs failed with IO error: {io}')
+            self.logger.error('Trying to reconnect (disconnecting, connecting')
+            self._disconnect()
+        except Exception as e:
+            self.logger.error(f'write_addrs failed with error: {e}')
+        finally:
+            self._lock.release()
+
+        return results
+
 #
 # initialization methods
 #
 
+    def _init_profiling(self):
+        '''
+        Wrap transport methods to record timing spans
+        '''
+        spans = {'send_cyclic_cmds': 'cyclic',
+                 '_init_communication': 'init_communication',
+                 '_KW_get_sync': 'kw_sync',
+                 '_send_bytes': 'send_bytes',
+                 '_read_bytes': 'read_bytes',
+                 '_parse_response': 'parse_response',
+                 '_process_value': 'item'}
+        for method, span in spans.items():
+            setattr(self, method, self._profiler.wrap(getattr(self, method), span))
+        self.logger.info(f'Profiling enabled for {", ".join(spans.values())}')
+
     def _load_configuration(self):
         '''
         Load configuration sets from commands.py
@@ -522,6 +926,7 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Loaded operating modes for heating type {self._operatingmodes}')
             self._systemschemes = commands.systemschemes[self._heating_type]
             self.logger.debug(f'Loaded system schemes for heating type {self._systemschemes}')
+            self._fault_commandcodes = sorted(commandconf['addr'].lower() for commandconf in self._commandset.values() if commandconf['unit'] == 'ES') or [None]
         else:
             sets = []
             if self._heating_type not in commands.commandset:
@@ -540,8 +945,9 @@ class Viessmann(SmartPlugin):
 
     def _connect(self):
         '''
-        Tries to establish a connection to the serial reading device. To prevent
-        multiple concurrent connection locking is used.
+        Tries to establish a connection to the serial reading device. The connection
+        state is changed while holding self._lock, so concurrent callers wait for
+        the first caller's attempt instead of opening the port several times.
 
         :return: Returns True if connection was established, False otherwise
         :rtype: bool
@@ -549,36 +955,48 @@ class Viessmann(SmartPlugin):
         if not self.alive:
             return False
 
-        if self._connected and self._serial:
-            return True
-
-        self._lock.acquire()
-        try:
-            self.logger.debug(f'Connecting to {self._serialport}..')
-            self._serial = serial.Serial()
-            self._serial.baudrate = self._controlset['Baudrate']
-            self._serial.parity = self._controlset['Parity']
-            self._serial.bytesize = self._controlset['Bytesize']
-            self._serial.stopbits = self._controlset['Stopbits']
-            self._serial.port = self._serialport
-
-            # both of the following timeout values are determined by trial and error
-            if self._protocol == 'KW':
-                # needed to "capture" the 0x05 sync bytes
-                self._serial.timeout = 1.0
-            else:
-                # not too long to prevent lags in communication.
-                self._serial.timeout = 0.5
-            self._serial.open()
-            self._connected = True
-            self.logger.info(f'Connected to {self._serialport}')
-            self._connection_attempts = 0
-            if not self._standalone and not self.scheduler_get('cyclic'):
-                self._create_cyclic_scheduler()
-            return True
-        except Exception as e:
-            self.logger.error(f'Could not _connect to {self._serialport}; Error: {e}')
+        if not self._acquire_lock():
             return False
+        try:
+            if self._serial and self._state in (self.INITIALIZING, self.READY):
+                return True
+
+            self._set_state(self.CONNECTING)
+            self._close_serial()
+            try:
+                self.logger.debug(f'Connecting to {self._serialport}..')
+                if self._serialport.startswith('replay:'):
+                    self._serial = ReplaySerial(self._serialport[7:], self.logger)
+                else:
+                    self._serial = serial.Serial()
+                self._serial.baudrate = self._controlset['Baudrate']
+                self._serial.parity = self._controlset['Parity']
+                self._serial.bytesize = self._controlset['Bytesize']
+                self._serial.stopbits = self._controlset['Stopbits']
+                self._serial.port = self._serialport
+
+                # both of the following timeout values are determined by trial and error
+                if self._protocol == 'KW':
+                    # needed to "capture" the 0x05 sync bytes
+                    self._serial.timeout = 1.0
+                else:
+                    # not too long to prevent lags in communication.
+                    self._serial.timeout = 0.5
+                self._serial.open()
+                if self._capture_file:
+                    self._serial = CaptureSerial(self._serial, self._capture_file)
+                    self.logger.info(f'Capturing communication to {self._capture_file}')
+                self._set_state(self.INITIALIZING)
+                self.logger.info(f'Connected to {self._serialport}')
+                self._connection_attempts = 0
+                if not self._standalone and not self.scheduler_get('cyclic'):
+                    self._create_cyclic_scheduler()
+                return True
+            except Exception as e:
+                self.logger.error(f'Could not _connect to {self._serialport}; Error: {e}')
+                self._serial = None
+                self._set_state(self.FAILED)
+                return False
         finally:
             self._lock.release()
 
@@ -586,19 +1004,49 @@ class Viessmann(SmartPlugin):
         '''
         Disconnect any connected devices.
         '''
-        self._connected = False
-        self._initialized = False
-        try:
-            self._serial.close()
-        except IOError:
-            pass
-        self._serial = None
-        try:
-            self._lock.release()
-        except RuntimeError:
-            pass
+        with self._lock:
+            self._close_serial()
+            self._set_state(self.DISCONNECTED)
         self.logger.info('Disconnected')
 
+    def _close_serial(self):
+        '''
+        Close the serial device, if open. self._lock must be held by the caller.
+        '''
+        if self._serial:
+            try:
+                self._serial.close()
+            except IOError:
+                pass
+        self._serial = None
+
+    def _set_state(self, state):
+        '''
+        Change connection state. self._lock must be held by the caller.
+
+        :param state: New connection state, one of DISCONNECTED, CONNECTING, INITIALIZING, READY, FAILED
+        :type state: str
+        '''
+        if state != self._state:
+            self.logger.debug(f'Connection state changed from {self._state} to {state}')
+            self._state = state
+        if state == self.FAILED:
+            self._failed_time = time.time()
+
+    @property
+    def _connected(self):
+        '''
+        True if the serial device is open and can be used for communication
+        '''
+        return self._state in (self.INITIALIZING, self.READY)
+
+    @property
+    def _initialized(self):
+        '''
+        True if communication with the device is initialized
+        '''
+        return self._state == self.READY
+
     def _init_communication(self):
         '''
         After connecting to the device, setup the communication protocol
@@ -606,59 +1054,174 @@ class Viessmann(SmartPlugin):
         :return: Returns True, if communication was established successfully, False otherwise
         :rtype: bool
         '''
-        # just try to connect anyway; if connected, this does nothing and no harm, if not, it connects
-        if not self._connect():
-
-            self.logger.error('Init communication not possible as connect failed.')
+        if not self._acquire_lock():
             return False
+        try:
+            # just try to connect anyway; if connected, this does nothing and no harm, if not, it connects
+            if not self._connect():
 
-        # initialization only necessary for P300 protocol...
-        if self._protocol == 'P300':
-
-            # init procedure is
-            # interface: 0x04 (reset)
-            #                           device: 0x05 (repeated)
-            # interface: 0x160000 (sync)
-            #                           device: 0x06 (sync ok)
-            # interface: resume communication, periodically send 0x160000 as keepalive if necessary
-
-            self.logger.debug('Init Communication....')
-            is_initialized = False
-            initstringsent = False
-            self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
-            self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
-            readbyte = self._read_bytes(1)
-            self.logger.debug(f'read_bytes: read {readbyte}, last byte is {self._lastbyte}')
-
-            for i in range(0, 10):
-                if initstringsent and self._lastbyte == self._int2bytes(self._controlset['Acknowledge'], 1):
-                    is_initialized = True
-                    self.logger.debug('Device acknowledged initialization')
-                    break
-                if self._lastbyte == self._int2bytes(self._controlset['Not_initiated'], 1):
-                    self._send_bytes(self._int2bytes(self._controlset['Sync_Command'], 3))
-                    self.logger.debug(f'send_bytes: Send sync command {self._int2bytes(self._controlset["Sync_Command"], 3)}')
-                    initstringsent = True
-                elif self._lastbyte == self._int2bytes(self._controlset['Init_Error'], 1):
-                    self.logger.error(f'The interface has reported an error (\x15), loop increment {i}')
-                    self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
-                    self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
-                    initstringsent = False
-                else:
-                    self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
-                    self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
-                    initstringsent = False
+                self.logger.error('Init communication not possible as connect failed.')
+                return False
+
+            # initialization only necessary for P300 protocol...
+            if self._protocol == 'P300':
+
+                # init procedure is
+                # interface: 0x04 (reset)
+                #                           device: 0x05 (repeated)
+                # interface: 0x160000 (sync)
+                #                           device: 0x06 (sync ok)
+                # interface: resume communication, periodically send 0x160000 as keepalive if necessary
+
+                self.logger.debug('Init Communication....')
+                self._set_state(self.INITIALIZING)
+                self._metrics.count('reinits')
+                is_initialized = False
+                initstringsent = False
+                self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
+                self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
                 readbyte = self._read_bytes(1)
                 self.logger.debug(f'read_bytes: read {readbyte}, last byte is {self._lastbyte}')
 
-            self.logger.debug(f'Communication initialized: {is_initialized}')
-            self._initialized = is_initialized
+                for i in range(0, 10):
+                    self._check_request()
+                    if initstringsent and self._lastbyte == self._int2bytes(self._controlset['Acknowledge'], 1):
+                        is_initialized = True
+                        self.logger.debug('Device acknowledged initialization')
+                        break
+                    if self._lastbyte == self._int2bytes(self._controlset['Not_initiated'], 1):
+                        self._send_bytes(self._int2bytes(self._controlset['Sync_Command'], 3))
+                        self.logger.debug(f'send_bytes: Send sync command {self._int2bytes(self._controlset["Sync_Command"], 3)}')
+                        initstringsent = True
+                    elif self._lastbyte == self._int2bytes(self._controlset['Init_Error'], 1):
+                        self.logger.error(f'The interface has reported an error (\x15), loop increment {i}')
+                        self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
+                        self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
+                        initstringsent = False
+                    else:
+                        self._send_bytes(self._int2bytes(self._controlset['Reset_Command'], 1))
+                        self.logger.debug(f'send_bytes: Send reset command {self._int2bytes(self._controlset["Reset_Command"], 1)}')
+                        initstringsent = False
+                    readbyte = self._read_bytes(1)
+                    self.logger.debug(f'read_bytes: read {readbyte}, last byte is {self._lastbyte}')
 
-        else:  # at the moment the only other supported protocol is 'KW' which is not stateful
-            is_initialized = True
-            self._initialized = is_initialized
+                self.logger.debug(f'Communication initialized: {is_initialized}')
+
+            else:  # at the moment the only other supported protocol is 'KW' which is not stateful
+                is_initialized = True
+
+            self._set_state(self.READY if is_initialized else self.FAILED)
+
+            return is_initialized
+        except RequestCancelled as e:
+            self._request_cancelled(e)
+            return False
+        finally:
+            self._lock.release()
+
+    def _ensure_ready(self, since):
+        '''
+        Make sure the connection is ready for sending commands, reconnecting and
+        re-initializing as necessary. self._lock must be held by the caller.
+
+        If an attempt to connect failed while the caller was waiting for the lock,
+        the caller gives up without trying again, so reconnecting is done once
+        for all waiting callers instead of once per caller.
+
+        :param since: Time the caller started waiting for the lock
+        :type since: float
+        :return: True if connection is ready, False otherwise
+        :rtype: bool
+        '''
+        if self._state == self.READY:
+            if self._protocol != 'P300' or (time.time() - 500) <= self._lastbytetime:
+                return True
+            self.logger.debug('Communication timed out, trying to reestablish communication.')
+        elif self._state == self.FAILED and self._failed_time >= since:
+            self.logger.debug('Connection attempt failed while waiting, not trying again')
+            return False
+        elif self._state == self.INITIALIZING:
+            self.logger.info('Communication no longer initialized, trying to reestablish.')
+        else:
+            self.logger.error('Not connected, trying to reconnect.')
+            self._metrics.count('reconnects')
 
-        return is_initialized
+        return self._init_communication()
+
+    @contextlib.contextmanager
+    def _request_deadline(self, timeout=None):
+        '''
+        Limit the time all requests of the current thread inside the context may take.
+        Nested deadlines can only shorten the outer deadline.
+
+        :param timeout: maximum time in seconds, defaults to plugin parameter ``request_timeout``, 0 for no limit
+        :type timeout: float
+        '''
+        if timeout is None:
+            timeout = self._request_timeout
+        previous = getattr(self._request, 'deadline', None)
+        if timeout:
+            deadline = time.time() + timeout
+            self._request.deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            self._request.deadline = previous
+
+    def _request_remaining(self):
+        '''
+        :return: Time in seconds left until the deadline of the current request, None if there is no deadline
+        :rtype: float
+        '''
+        deadline = getattr(self._request, 'deadline', None)
+        if deadline is None:
+            return None
+        return max(0, deadline - time.time())
+
+    def _check_request(self):
+        '''
+        Raise RequestCancelled if the plugin is stopping or the deadline of the current request has passed
+        '''
+        if self._stop_event.is_set():
+            raise RequestCancelled('plugin is stopping')
+        deadline = getattr(self._request, 'deadline', None)
+        if deadline is not None and time.time() > deadline:
+            raise RequestCancelled('deadline exceeded')
+
+    def _acquire_lock(self, commandname=''):
+        '''
+        Wait for self._lock until the deadline of the current request or until the plugin is stopped
+
+        :param commandname: Command the lock is needed for, only used for metrics and logging
+        :type commandname: str
+        :return: True if the lock was acquired, False otherwise
+        :rtype: bool
+        '''
+        if self._lock.acquire(self._request_remaining(), self._stop_event.is_set):
+            return True
+        if self._stop_event.is_set():
+            self.logger.debug(f'Plugin is stopping, not sending command {commandname}')
+        else:
+            self.logger.warning(f'Deadline exceeded while waiting for the serial device, not sending command {commandname}')
+            self._metrics.count('timeouts', commandname or None)
+        return False
+
+    def _request_cancelled(self, e):
+        '''
+        Handle a request cancelled during communication. self._lock must be held by the caller.
+
+        :param e: Exception describing the reason
+        :type e: RequestCancelled
+        '''
+        self.logger.info(f'Request cancelled: {e}')
+        # the device might still be sending the response, so discard it and start over next time
+        if self._serial:
+            try:
+                self._serial.reset_input_buffer()
+            except IOError:
+                pass
+        if self._state == self.READY:
+            self._set_state(self.INITIALIZING)
 
     def _create_cyclic_scheduler(self):
         '''
@@ -683,6 +1246,139 @@ class Viessmann(SmartPlugin):
             self.scheduler_add('cyclic', self.send_cyclic_cmds, cycle=workercycle, prio=5, offset=0)
             self.logger.info(f'Added cyclic worker thread ({workercycle} sec cycle). Shortest item update cycle found: {shortestcycle} sec')
 
+    def _plan_bus_budget(self, report=True):
+        '''
+        Estimate the bus time needed for all configured cyclic reads and check if
+        the cyclic worker is able to handle them in time.
+
+        Wire time is calculated from telegram and response length at the configured
+        baudrate and framing. Device turnaround is taken from metrics if the command
+        has already been read, otherwise a default is used.
+
+        :param report: log planning results
+        :type report: bool
+        :return: planning results
+        :rtype: dict
+        '''
+        # estimated defaults, used until real values are measured
+        default_turnaround = 0.05
+        # KW devices send sync bytes about every 2 seconds, so on average we wait half of that
+        kw_synctime = 1.0 if self._protocol == 'KW' else 0
+
+        # start bit, data bits, parity bit, stop bits per byte
+        framebits = 1 + self._controlset['Bytesize'] + (0 if self._controlset['Parity'] == 'N' else 1) + self._controlset['Stopbits']
+        bytetime = framebits / self._controlset['Baudrate']
+        measured = self._metrics.snapshot()['commands']
+
+        commands = {}
+        for commandcode, entry in self._cyclic_cmds.items():
+            commandname = self._commandname_by_commandcode(commandcode)
+            if entry['cycle'] <= 0:
+                self.logger.warning(f'Ignoring cyclic read of {commandname} with invalid cycle {entry["cycle"]} in bus time planning')
+                continue
+            (packet, responselen) = self._build_packet(commandcode, self._commandset[commandname]['len'], KWFollowUp=self._protocol == 'KW')
+            turnaround = default_turnaround
+            stats = measured.get(commandname)
+            if stats and stats['phases']['receive']['count']:
+                turnaround = max(0, stats['phases']['receive']['avg'] / 1000 - responselen * bytetime)
+            duration = (len(packet) + responselen) * bytetime + turnaround
+            commands[commandcode] = {
+                'commandname': commandname,
+                'item': str(self._params[commandcode]['item']) if commandcode in self._params else '',
+                'cycle': entry['cycle'],
+                'bytes': len(packet) + responselen,
+                'turnaround': round(turnaround * 1000, 1),
+                'measured': bool(stats and stats['phases']['receive']['count']),
+                'duration': duration,
+                'load': duration / entry['cycle']}
+
+        budget = {'workercycle': 0, 'utilization': 0, 'feasible': True, 'burst': None, 'busiest': [], 'infeasible': [], 'commands': []}
+        if commands:
+            # cyclic worker runs with half of the shortest cycle, see _create_cyclic_scheduler()
+            workercycle = max(1, int(min(entry['cycle'] for entry in commands.values()) / 2))
+            (periods, durations, counts) = self._simulate_cyclic_reads(commands, workercycle)
+            passcount = len(durations)
+
+            def pass_info(index):
+                return {'time': index * workercycle,
+                        'duration': round(durations[index] + kw_synctime, 3),
+                        'load': round((durations[index] + kw_synctime) / workercycle * 100, 1),
+                        'commands': [commands[commandcode]['commandname'] for commandcode in periods if index % periods[commandcode] == 0]}
+
+            # all commands are read on the first pass after startup. This burst only delays
+            # the first reads, so feasibility is judged on the passes after it
+            burst = pass_info(0)
+            busiest = [pass_info(index) for index in sorted(range(1, passcount), key=lambda index: durations[index], reverse=True)[:5] if counts[index]]
+            steadytime = (passcount - 1) * workercycle
+            steady = sum(durations[1:]) + kw_synctime * sum(1 for count in counts[1:] if count)
+            utilization = steady / steadytime
+
+            # find commands which need to be removed to bring the steady state bus time within
+            # the available time, busiest first. Single passes may take longer than the worker
+            # cycle, the following reads are only delayed then
+            remaining = dict(commands)
+            infeasible = []
+            while remaining and steady > steadytime:
+                commandcode = max(remaining, key=lambda code: remaining[code]['load'])
+                entry = remaining.pop(commandcode)
+                infeasible.append(entry)
+                for index in range(periods[commandcode], passcount, periods[commandcode]):
+                    steady -= entry['duration']
+                    counts[index] -= 1
+                    if not counts[index]:
+                        steady -= kw_synctime
+
+            budget = {
+                'workercycle': workercycle,
+                'horizon': passcount * workercycle,
+                'utilization': round(utilization * 100, 1),
+                'feasible': not infeasible,
+                'burst': burst,
+                'busiest': busiest,
+                'infeasible': [{'commandname': entry['commandname'], 'item': entry['item']} for entry in infeasible],
+                'commands': sorted(commands.values(), key=lambda entry: entry['load'], reverse=True)}
+
+        self._bus_budget = budget
+        if report and commands:
+            self.logger.info(f'Cyclic reads of {len(commands)} commands use {budget["utilization"]}% of bus time, reading all of them after startup needs {budget["burst"]["duration"]:.2f} seconds')
+            if budget['busiest']:
+                self.logger.info(f'Busiest pass after startup needs {budget["busiest"][0]["duration"]:.2f} of {budget["workercycle"]} seconds')
+            for entry in budget['commands']:
+                self.logger.debug(f'Cyclic read of {entry["commandname"]} every {entry["cycle"]} seconds needs {entry["duration"] * 1000:.1f} ms ({entry["load"] * 100:.2f}% of bus time)')
+            if not budget['feasible']:
+                self.logger.warning(f'Cyclic read configuration is not feasible, reads will be delayed. Consider longer cycles for: {", ".join(entry["item"] or entry["commandname"] for entry in budget["infeasible"])}')
+        return budget
+
+    def _simulate_cyclic_reads(self, commands, workercycle):
+        '''
+        Simulate the cyclic worker to find bus time per worker pass. All commands are read
+        on the first pass after startup, afterwards each command is read on the first pass
+        at least its cycle after the previous read.
+
+        :param commands: dict of commandcodes with 'cycle' and 'duration'
+        :type commands: dict
+        :param workercycle: cycle of the cyclic worker in seconds
+        :type workercycle: int
+        :return: tuple of (dict of commandcodes with number of passes between reads, list of bus time per pass without sync time, list of number of commands per pass)
+        :rtype: tuple
+        '''
+        # simulate until the schedule repeats, but limit to one hour or two of the longest cycles
+        horizon = workercycle
+        for entry in commands.values():
+            horizon = horizon * entry['cycle'] // math.gcd(horizon, entry['cycle'])
+        horizon = min(horizon, max(3600, 2 * max(entry['cycle'] for entry in commands.values())))
+        passcount = max(2, math.ceil(horizon / workercycle))
+
+        periods = {}
+        durations = [0.0] * passcount
+        counts = [0] * passcount
+        for commandcode, entry in commands.items():
+            periods[commandcode] = max(1, math.ceil(entry['cycle'] / workercycle))
+            for index in range(0, passcount, periods[commandcode]):
+                durations[index] += entry['duration']
+                counts[index] += 1
+        return (periods, durations, counts)
+
     def _read_initial_values(self):
         '''
         Read all values configured to be read at startup / connection
@@ -715,6 +1411,8 @@ class Viessmann(SmartPlugin):
         if self._application_timer is not []:
             self.logger.debug('Starting timer read commands.')
             for timer_app in self._application_timer:
+                if self._read_timer_block(timer_app):
+                    continue
                 for commandcode in self._application_timer[timer_app]['commandcodes']:
                     commandname = self._commandname_by_commandcode(commandcode)
                     self.logger.debug(f'send_timer_commands {commandname}')
@@ -723,6 +1421,279 @@ class Viessmann(SmartPlugin):
             self.logger.debug(f'Timer Readout done = {self._timerread}')
             self._viess_dict_to_uzsu_dict()
 
+    def _read_timer_block(self, timer_app):
+        '''
+        Read all timers of a timer application with one block read, if the
+        timer addresses are contiguous and the device accepts the block length
+
+        :param timer_app: Application for which the timers should be read, as in commands.py
+        :type timer_app: str
+        :return: True if all timers were read and processed, False if single reads are necessary
+        :rtype: bool
+        '''
+        app = self._application_timer[timer_app]
+        if not app['blockread']:
+            return False
+
+        # check for contiguous addresses
+        commandnames = [self._commandname_by_commandcode(commandcode) for commandcode in app['commandcodes']]
+        nextaddr = int(app['commandcodes'][0], 16)
+        for commandname in commandnames:
+            if int(self._commandset[commandname]['addr'], 16) != nextaddr:
+                self.logger.debug(f'Timer addresses of application {timer_app} are not contiguous, using single reads')
+                app['blockread'] = False
+                return False
+            nextaddr += self._commandset[commandname]['len']
+        blocklength = nextaddr - int(app['commandcodes'][0], 16)
+
+        self.logger.debug(f'send_timer_block {timer_app} with {blocklength} bytes from address {app["commandcodes"][0]}')
+        (rawdatabytes, rejected) = self._read_block_checked(app['commandcodes'][0], blocklength)
+        if rawdatabytes is None:
+            if rejected:
+                self.logger.info(f'Device rejected block read of {blocklength} bytes for timer application {timer_app}, using single reads from now on')
+                app['blockread'] = False
+            else:
+                self.logger.info(f'Block read of {blocklength} bytes for timer application {timer_app} failed, using single reads this time')
+            return False
+
+        # split block into single timers and process as if read separately
+        offset = 0
+        for commandcode, commandname in zip(app['commandcodes'], commandnames):
+            commandvaluebytes = self._commandset[commandname]['len']
+            value = self._decode_value(rawdatabytes[offset:offset + commandvaluebytes], commandname)
+            offset += commandvaluebytes
+            if value is None:
+                continue
+            self._store_value(commandcode, value)
+            self._process_value(value, commandcode)
+        return True
+
+    def _read_block(self, commandcode, length):
+        '''
+        Read raw value bytes from device, independent of command config
+
+        :param commandcode: start address of block
+        :type commandcode: str
+        :param length: number of bytes to read
+        :type length: int
+        :return: value bytes if read was successful, None otherwise
+        :rtype: bytearray
+        '''
+        return self._read_block_checked(commandcode, length)[0]
+
+    def _read_block_checked(self, commandcode, length):
+        '''
+        Read raw value bytes from device and tell a rejected block read from
+        transient errors like timeouts or checksum errors
+
+        :param commandcode: start address of block
+        :type commandcode: str
+        :param length: number of bytes to read
+        :type length: int
+        :return: tuple of (value bytes or None, True if the device rejected the block read)
+        :rtype: tuple
+        '''
+        (packet, responselen) = self._build_packet(commandcode.lower(), length)
+        self.logger.debug(f'Created block read of {length} bytes from address {commandcode} to be sent as hexstring: {self._bytes2hexstring(packet)}')
+
+        metricname = f'block {commandcode.lower()}'
+        self._metrics.count('requests', metricname)
+        response = self._send_command_packet(packet, responselen, metricname)
+        if response is None:
+            self._metrics.count('errors', metricname)
+            return (None, False)
+
+        if self._protocol == 'P300':
+            # response telegram as in _parse_response
+            if len(response) < 9 or self._calc_checksum(response[1:len(response) - 1]) != response[len(response) - 1]:
+                self.logger.error(f'Invalid response or checksum on block read from address {commandcode}: {self._bytes2hexstring(response)}')
+                self._metrics.count('checksum_errors', metricname)
+                return (None, False)
+            if response[3] == self._controlset['Error'] or response[5:7].hex() != commandcode.lower() or response[7] != length:
+                self.logger.debug(f'Device rejected block read of {length} bytes from address {commandcode}')
+                return (None, True)
+            return (bytearray(response[8:8 + length]), False)
+
+        if len(response) != length:
+            self.logger.debug(f'Received {len(response)} instead of {length} bytes on block read from address {commandcode}')
+            return (None, len(response) > 0)
+        return (bytearray(response), False)
+
+    def _write_item_value(self, item, commandname, value, revert_value):
+        '''
+        Write item value to device and run configured followup actions
+
+        :param item: item which value is to be written
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        :param value: value to write
+        :param revert_value: value to set the item to if writing fails
+        '''
+        if not self._send_command(commandname, value):
+            # create_write_command() liefert False, wenn das Schreiben fehlgeschlagen ist
+            # -> dann auch keine weitere Verarbeitung
+            self.logger.debug(f'Write for {commandname} with value {value} failed, reverting value, canceling followup actions')
+            item(revert_value, self.get_shortname())
+            return None
+
+        # If the written value should be used directly instead of reading it back
+        ack_update = False
+        if self.has_iattr(item.conf, 'viess_ack_update') and self.get_iattr_value(item.conf, 'viess_ack_update'):
+            ack_update = self._apply_written_value(commandname, value)
+
+        readafterwrite = None
+        if self.has_iattr(item.conf, 'viess_read_afterwrite'):
+            readafterwrite = self.get_iattr_value(item.conf, 'viess_read_afterwrite')
+
+        # If a read command should be sent after write
+        if self.has_iattr(item.conf, 'viess_read') and readafterwrite is not None:
+            readcommandname = self.get_iattr_value(item.conf, 'viess_read')
+            self.logger.debug(f'Attempting read after write for item {item}, command {readcommandname}, delay {readafterwrite}')
+            if readcommandname is not None and readafterwrite is not None:
+                aw = float(readafterwrite)
+                if ack_update:
+                    # value is already known, so just verify it later without blocking
+                    self._schedule_verify_read(readcommandname, aw)
+                else:
+                    time.sleep(aw)
+                    self._send_command(readcommandname)
+
+        # If commands should be triggered after this write
+        if self.has_iattr(item.conf, 'viess_trigger'):
+            trigger = self.get_iattr_value(item.conf, 'viess_trigger')
+            if trigger is None:
+                self.logger.error(f'Item {item} contains invalid trigger command list {trigger}!')
+            else:
+                tdelay = 5  # default delay
+                if self.has_iattr(item.conf, 'viess_trigger_afterwrite'):
+                    tdelay = float(self.get_iattr_value(item.conf, 'viess_trigger_afterwrite'))
+                if type(trigger) != list:
+                    trigger = [trigger]
+                for triggername in trigger:
+                    triggername = triggername.strip()
+                    if triggername:
+                        self.logger.debug(f'Triggering command {triggername} after write for item {item}')
+                        time.sleep(tdelay)
+                        self._send_command(triggername)
+
+    def _apply_written_value(self, commandname, value):
+        '''
+        Store successfully written value as if it was read from the device and
+        update the corresponding read item. Only possible for plain integer and bool
+        commands, as the value read from the device is known in advance.
+
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        :param value: value written to device
+        :return: True if value was applied, False if it needs to be read from device
+        :rtype: bool
+        '''
+        commandconf = self._commandset[commandname]
+        commandcode = commandconf['addr'].lower()
+        unitconf = self._unitset.get(commandconf['unit'])
+        if not unitconf or unitconf['type'] != 'integer':
+            self.logger.debug(f'Written value for command {commandname} with unit {commandconf["unit"]} can not be applied directly')
+            return False
+
+        # apply write and read transform to get the value the device will return
+        transform = unitconf['read_value_transform']
+        try:
+            if transform == 'bool':
+                value = bool(value)
+            elif self._isfloat(transform):
+                value = self._value_transform_read(self._value_transform_write(value, transform), transform)
+            else:
+                value = int(value)
+        except (TypeError, ValueError) as e:
+            self.logger.debug(f'Written value {value} for command {commandname} could not be transformed: {e}')
+            return False
+
+        self.logger.debug(f'Applying written value {value} for command {commandname}')
+        # not read from the device, so keep it out of the value history
+        self._store_value(commandcode, value, history=False)
+        if commandcode in self._params:
+            self._params[commandcode]['item'](value, self.get_shortname())
+        return True
+
+    def _schedule_verify_read(self, commandname, delay):
+        '''
+        Schedule a single read of the given command after delay. A previously
+        scheduled read for the same command is replaced.
+
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        :param delay: delay in seconds
+        :type delay: float
+        '''
+        with self._write_lock:
+            timer = self._verify_reads.pop(commandname, None)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(delay, self._verify_read, [commandname])
+            timer.daemon = True
+            self._verify_reads[commandname] = timer
+            timer.start()
+
+    def _verify_read(self, commandname):
+        '''
+        Read command scheduled by _schedule_verify_read
+
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        '''
+        with self._write_lock:
+            self._verify_reads.pop(commandname, None)
+        if self.alive:
+            self.logger.debug(f'Verifying written value for command {commandname}')
+            self._send_command(commandname)
+
+    def _queue_write(self, item, commandname, value, window):
+        '''
+        Queue value for writing after coalescing window. If a value for the same command
+        is already pending, it is replaced and the window is restarted, so only the latest
+        value is written once the item has not changed for the whole window.
+
+        :param item: item which value is to be written
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        :param value: value to write
+        :param window: coalescing window in seconds
+        :type window: float
+        '''
+        with self._write_lock:
+            timer = threading.Timer(window, self._flush_write, [commandname])
+            timer.daemon = True
+            pending = self._pending_writes.get(commandname)
+            if pending:
+                self.logger.debug(f'Replacing pending value {pending["value"]} with {value} for command {commandname}, writing in {window} seconds')
+                pending['timer'].cancel()
+                pending['item'] = item
+                pending['value'] = value
+                pending['timer'] = timer
+            else:
+                # remember value before first change to revert to if writing fails
+                self._pending_writes[commandname] = {'item': item, 'value': value, 'revert_value': item.property.last_value, 'timer': timer}
+                self.logger.debug(f'Queued value {value} for command {commandname}, writing in {window} seconds')
+            timer.start()
+
+    def _flush_write(self, commandname):
+        '''
+        Write the latest pending value for the given command
+
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        '''
+        with self._write_lock:
+            pending = self._pending_writes.get(commandname)
+            # a newer value restarted the window after this timer had already fired
+            if pending is None or pending['timer'] is not threading.current_thread():
+                return
+            del self._pending_writes[commandname]
+        if not self.alive:
+            return
+        self.logger.debug(f'Writing pending value {pending["value"]} for command {commandname}')
+        self._write_item_value(pending['item'], commandname, pending['value'], pending['revert_value'])
+
     def _send_command(self, commandname, value=None):
         '''
         Create formatted command sequence from command name and send to device
@@ -753,16 +1724,20 @@ class Viessmann(SmartPlugin):
             read_response = True
 
         # hand over built packet to send_command_packet
-        response_packet = self._send_command_packet(packet, responselen)
+        self._metrics.count('requests', commandname)
+        response_packet = self._send_command_packet(packet, responselen, commandname)
 
         # process response
         if response_packet is None:
+            self._metrics.count('errors', commandname)
             return False
 
-        result = self._process_response(response_packet, commandname, read_response)
+        result = self._process_response(response_packet, commandname, read_response, fault_log=True)
+        if result is None and not read_response:
+            self._metrics.count('errors', commandname)
         return result
 
-    def _KW_send_multiple_read_commands(self, commandcodes):
+    def _KW_send_multiple_read_commands(self, commandcodes, update_items=True, fault_log=True):
         '''
         Takes list of commandnames, builds all command packets and tries to send them in one go.
         This only works for read commands and only with KW protocol.
@@ -770,6 +1745,10 @@ class Viessmann(SmartPlugin):
 
         :param commandnames: List of commands for which to create command sequence as defined in commands.py
         :type commandname: str
+        :param update_items: True if values should be written to corresponding items
+        :type update_items: bool
+        :param fault_log: True if error entries should be added to the fault log
+        :type fault_log: bool
         '''
         if self._protocol != 'KW':
             self.logger.error(f'Called _KW_send_multiple_read_commands, but protocol is {self._protocol}. This shouldn\'t happen..')
@@ -791,15 +1770,13 @@ class Viessmann(SmartPlugin):
         if not bulk:
             return
 
-        if not self._connected:
-            self.logger.error('Not connected, trying to reconnect.')
-            if not self._connect():
-                self.logger.error('Could not connect to serial device')
-                return
-
-        self._lock.acquire()
+        starttime = time.time()
+        if not self._acquire_lock():
+            return
         try:
-            self._init_communication()
+            if not self._ensure_ready(starttime):
+                self._check_request()
+                raise Exception('Interface not initialized!')
 
             replies = {}
 
@@ -810,6 +1787,7 @@ class Viessmann(SmartPlugin):
             first_packet = bytearray(self._int2bytes(self._controlset['StartByte'], 1))
 
             for addr in bulk.keys():
+                self._check_request()
 
                 if first_cmd:
                     # make sure that the first sent packet has the StartByte (0x01) lead byte set
@@ -818,43 +1796,23 @@ class Viessmann(SmartPlugin):
                     bulk[addr]['packet'] = first_packet
                     first_cmd = False
 
-                # send query
-                try:
-                    self._send_bytes(bulk[addr]['packet'])
-                    self.logger.debug(f'Successfully sent packet: {self._bytes2hexstring(bulk[addr]["packet"])}')
-                except IOError as io:
-                    raise IOError(f'IO Error: {io}')
-                    return
-                except Exception as e:
-                    raise Exception(f'Exception while sending: {e}')
-                    return
-
-                # receive response
-                replies[addr] = bytearray()
-                try:
-                    self.logger.debug(f'Trying to receive {bulk[addr]["responselen"]} bytes of the response')
-                    chunk = self._read_bytes(bulk[addr]['responselen'])
-
-                    self.logger.debug(f'Received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
-                    if len(chunk) != 0:
-                        replies[addr].extend(chunk)
-                    else:
-                        self.logger.error(f'Received 0 bytes chunk from {addr} - this probably is a communication error, possibly a wrong datapoint address?')
-                        return
-                except IOError as io:
-                    raise IOError(f'IO Error: {io}')
-                    return
-                except Exception as e:
-                    raise Exception(f'Error receiving response: {e}')
+                # send query and receive response without new sync
+                self._metrics.count('requests', bulk[addr]['command'])
+                replies[addr] = self._transceive_packet(bulk[addr]['packet'], bulk[addr]['responselen'], False, bulk[addr]['command'])
+                if replies[addr] is None:
+                    self._metrics.count('errors', bulk[addr]['command'])
+                    self.logger.error(f'Received no response from {addr} - this probably is a communication error, possibly a wrong datapoint address?')
                     return
 
             # sent all read requests, time to parse the replies
             # do this inside the _lock-block so this doesn't interfere with
             # possible cyclic read data assignments
             for addr in bulk.keys():
-                if len(replies[addr]) > 0:
-                    self._process_response(replies[addr], bulk[addr]['command'], True)
+                self._process_response(replies[addr], bulk[addr]['command'], True, update_items, fault_log=fault_log)
 
+        except RequestCancelled as e:
+            self._request_cancelled(e)
+            return
         except IOError as io:
             self.logger.error(f'KW_send_multiple_read_commands failed with IO error: {io}')
             self.logger.error('Trying to reconnect (disconnecting, connecting')
@@ -864,10 +1822,7 @@ class Viessmann(SmartPlugin):
             self.logger.error(f'KW_send_multiple_read_commands failed with error: {e}')
             return
         finally:
-            try:
-                self._lock.release()
-            except RuntimeError:
-                pass
+            self._lock.release()
 
     def _KW_get_sync(self):
         '''
@@ -886,6 +1841,7 @@ class Viessmann(SmartPlugin):
 
         attempt = 0
         while attempt < retries:
+            self._check_request()
             self.logger.debug(f'Starting sync loop - attempt {attempt + 1}/{retries}')
 
             self._serial.reset_input_buffer()
@@ -895,14 +1851,14 @@ class Viessmann(SmartPlugin):
             if chunk == self._int2bytes(self._controlset['Not_initiated'], 1, False):
                 self.logger.debug('Got sync. Commencing command send')
                 return True
-            time.sleep(.8)
+            self._stop_event.wait(.8)
             attempt = attempt + 1
         self.logger.error(f'Sync not acquired after {attempt} attempts')
         self._disconnect()
 
         return False
 
-    def _send_command_packet(self, packet, packetlen_response):
+    def _send_command_packet(self, packet, packetlen_response, commandname=''):
         '''
         Send command sequence to device
 
@@ -910,77 +1866,23 @@ class Viessmann(SmartPlugin):
         :type packet: bytearray
         :param packetlen_response: number of bytes expected in reply
         :type packetlen_response: int
-        :param read_response: True if command was read command and value is expected, False if only status byte is expected (only needed for KW protocol)
-        :type read_response: bool
+        :param commandname: Command the packet was built for, only used for metrics
+        :type commandname: str
         :return: Response packet (bytearray) if no error occured, None otherwise
         '''
-        if not self._connected:
-            self.logger.error('Not connected, trying to reconnect.')
-            if not self._connect():
-                self.logger.error('Could not connect to serial device')
-                return None
-
-        self._lock.acquire()
+        waittime = time.time()
+        starttime = time.perf_counter()
+        if not self._acquire_lock(commandname):
+            return None
+        self._metrics.observe('queue', commandname, time.perf_counter() - starttime)
         try:
-            if not self._initialized or (time.time() - 500) > self._lastbytetime:
-                if self._protocol == 'P300':
-                    if self._initialized:
-                        self.logger.debug('Communication timed out, trying to reestablish communication.')
-                    else:
-                        self.logger.info('Communication no longer initialized, trying to reestablish.')
-                self._init_communication()
-
-            if self._initialized:
-                # send query
-                try:
-                    if self._protocol == 'KW':
-                        # try to get sync, exit if it fails
-                        if not self._KW_get_sync():
-                            return None
-
-                    self._send_bytes(packet)
-                    self.logger.debug(f'Successfully sent packet: {self._bytes2hexstring(packet)}')
-                except IOError as io:
-                    raise IOError(f'IO Error: {io}')
-                    return None
-                except Exception as e:
-                    raise Exception(f'Exception while sending: {e}')
-                    return None
-
-                # receive response
-                response_packet = bytearray()
-                self.logger.debug(f'Trying to receive {packetlen_response} bytes of the response')
-                chunk = self._read_bytes(packetlen_response)
-
-                if self._protocol == 'P300':
-                    self.logger.debug(f'Received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
-                    if len(chunk) != 0:
-                        if chunk[:1] == self._int2bytes(self._controlset['Error'], 1):
-                            self.logger.error(f'Interface returned error! response was: {chunk}')
-                        elif len(chunk) == 1 and chunk[:1] == self._int2bytes(self._controlset['Not_initiated'], 1):
-                            self.logger.error('Received invalid chunk, connection not initialized. Forcing re-initialize...')
-                            self._initialized = False
-                        elif chunk[:1] != self._int2bytes(self._controlset['Acknowledge'], 1):
-                            self.logger.error(f'Received invalid chunk, not starting with ACK! response was: {chunk}')
-                            self._error_count += 1
-                            if self._error_count >= 5:
-                                self.logger.warning('Encountered 5 invalid chunks in sequence. Maybe communication was lost, re-initializing')
-                                self._initialized = False
-                        else:
-                            response_packet.extend(chunk)
-                            self._error_count = 0
-                            return response_packet
-                    else:
-                        self.logger.error(f'Received 0 bytes chunk - ignoring response_packet! chunk was: {chunk}')
-                elif self._protocol == 'KW':
-                    self.logger.debug(f'Received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
-                    if len(chunk) != 0:
-                        response_packet.extend(chunk)
-                        return response_packet
-                    else:
-                        self.logger.error('Received 0 bytes chunk - this probably is a communication error, possibly a wrong datapoint address?')
+            if self._ensure_ready(waittime):
+                return self._transceive_packet(packet, packetlen_response, True, commandname)
             else:
+                self._check_request()
                 raise Exception('Interface not initialized!')
+        except RequestCancelled as e:
+            self._request_cancelled(e)
         except IOError as io:
             self.logger.error(f'send_command_packet failed with IO error: {io}')
             self.logger.error('Trying to reconnect (disconnecting, connecting')
@@ -988,14 +1890,90 @@ class Viessmann(SmartPlugin):
         except Exception as e:
             self.logger.error(f'send_command_packet failed with error: {e}')
         finally:
-            try:
-                self._lock.release()
-            except RuntimeError:
-                pass
+            self._lock.release()
 
         # if we didn't return with data earlier, we hit an error. Act accordingly
         return None
 
+    def _transceive_packet(self, packet, packetlen_response, sync=True, commandname=''):
+        '''
+        Send command sequence to device and receive response.
+        Connection must be initialized and self._lock must be held by the caller.
+
+        :param packet: Command sequence to send
+        :type packet: bytearray
+        :param packetlen_response: number of bytes expected in reply
+        :type packetlen_response: int
+        :param sync: get sync before sending (only needed for KW protocol)
+        :type sync: bool
+        :param commandname: Command the packet was built for, only used for metrics
+        :type commandname: str
+        :return: Response packet (bytearray) if no error occured, None otherwise
+        '''
+        # send query
+        try:
+            starttime = time.perf_counter()
+            if self._protocol == 'KW' and sync:
+                # try to get sync, exit if it fails
+                if not self._KW_get_sync():
+                    return None
+
+            self._send_bytes(packet)
+            self._metrics.observe('send', commandname, time.perf_counter() - starttime)
+            self._metrics.count('bytes_sent', commandname, len(packet), False)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f'Successfully sent packet: {self._bytes2hexstring(packet)}')
+        except RequestCancelled:
+            raise
+        except IOError as io:
+            raise IOError(f'IO Error: {io}')
+            return None
+        except Exception as e:
+            raise Exception(f'Exception while sending: {e}')
+            return None
+
+        # receive response
+        response_packet = bytearray()
+        self.logger.debug(f'Trying to receive {packetlen_response} bytes of the response')
+        starttime = time.perf_counter()
+        chunk = self._read_bytes(packetlen_response)
+        self._metrics.observe('receive', commandname, time.perf_counter() - starttime)
+        self._metrics.count('bytes_received', commandname, len(chunk), False)
+        if len(chunk) < packetlen_response:
+            self._metrics.count('timeouts', commandname)
+
+        if self._protocol == 'P300':
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f'Received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
+            if len(chunk) != 0:
+                if chunk[:1] == self._int2bytes(self._controlset['Error'], 1):
+                    self.logger.error(f'Interface returned error! response was: {chunk}')
+                elif len(chunk) == 1 and chunk[:1] == self._int2bytes(self._controlset['Not_initiated'], 1):
+                    self.logger.error('Received invalid chunk, connection not initialized. Forcing re-initialize...')
+                    self._set_state(self.INITIALIZING)
+                elif chunk[:1] != self._int2bytes(self._controlset['Acknowledge'], 1):
+                    self.logger.error(f'Received invalid chunk, not starting with ACK! response was: {chunk}')
+                    self._error_count += 1
+                    if self._error_count >= 5:
+                        self.logger.warning('Encountered 5 invalid chunks in sequence. Maybe communication was lost, re-initializing')
+                        self._set_state(self.INITIALIZING)
+                else:
+                    response_packet.extend(chunk)
+                    self._error_count = 0
+                    return response_packet
+            else:
+                self.logger.error(f'Received 0 bytes chunk - ignoring response_packet! chunk was: {chunk}')
+        elif self._protocol == 'KW':
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f'Received {len(chunk)} bytes chunk of response as hexstring {self._bytes2hexstring(chunk)} and as bytes {chunk}')
+            if len(chunk) != 0:
+                response_packet.extend(chunk)
+                return response_packet
+            else:
+                self.logger.error('Received 0 bytes chunk - this probably is a communication error, possibly a wrong datapoint address?')
+
+        return None
+
     def _send_bytes(self, packet):
         '''
         Send data to device
@@ -1013,6 +1991,8 @@ class Viessmann(SmartPlugin):
         except serial.SerialTimeoutException:
             return False
 
+        self._metrics.count('bytes_sent', n=len(packet))
+
         # self.logger.debug(f'send_bytes: Sent {packet}')
         return True
 
@@ -1034,11 +2014,13 @@ class Viessmann(SmartPlugin):
 
         # don't wait for input indefinitely, stop after self._timeout seconds
         while time.time() <= starttime + self._timeout:
+            self._check_request()
             readbyte = self._serial.read()
             self._lastbyte = readbyte
             # self.logger.debug(f'read_bytes: Read {readbyte}')
             if readbyte != b'':
                 self._lastbytetime = time.time()
+                self._metrics.count('bytes_received', n=len(readbyte))
             else:
                 return totalreadbytes
             totalreadbytes += readbyte
@@ -1049,13 +2031,12 @@ class Viessmann(SmartPlugin):
         if not totalreadbytes:
 
             # just in case, force plugin to reconnect
-            self._connected = False
-            self._initialized = False
+            self._set_state(self.DISCONNECTED)
 
         # return what we got so far, might be 0
         return totalreadbytes
 
-    def _process_response(self, response, commandname='', read_response=True, update_item=True):
+    def _process_response(self, response, commandname='', read_response=True, update_item=True, fault_log=False):
         '''
         Process device response data, try to parse type and value and assign value to associated item
 
@@ -1067,8 +2048,12 @@ class Viessmann(SmartPlugin):
         :type read_response: bool
         :param update_item: True if value should be written to corresponding item
         :type update_item: bool
+        :param fault_log: True if error entries should be added to the fault log
+        :type fault_log: bool
         '''
-        res = self._parse_response(response, commandname, read_response)
+        starttime = time.perf_counter()
+        res = self._parse_response(response, commandname, read_response, fault_log=fault_log)
+        self._metrics.observe('parse', commandname, time.perf_counter() - starttime)
 
         # None means error on read/parse or write reponse. Errors are already logged, so no further action necessary
         if res is None:
@@ -1080,7 +2065,20 @@ class Viessmann(SmartPlugin):
 
         # assign results
         (value, commandcode) = res
+        starttime = time.perf_counter()
+        self._process_value(value, commandcode, update_item)
+        self._metrics.observe('item', commandname, time.perf_counter() - starttime)
+
+    def _process_value(self, value, commandcode, update_item=True):
+        '''
+        Assign parsed value to associated item and timer dict
 
+        :param value: Parsed value
+        :param commandcode: address of command
+        :type commandcode: str
+        :param update_item: True if value should be written to corresponding item
+        :type update_item: bool
+        '''
         # get command config
         commandname = self._commandname_by_commandcode(commandcode)
         commandconf = self._commandset[commandname]
@@ -1142,7 +2140,10 @@ class Viessmann(SmartPlugin):
             if timer_app not in self._viess_timer_dict:
                 self._viess_timer_dict[timer_app] = {}
 
-            self._viess_timer_dict[timer_app][commandname] = value
+            # remember changed applications for next UZSU update
+            if self._viess_timer_dict[timer_app].get(commandname) != value:
+                self._viess_timer_dict[timer_app][commandname] = value
+                self._timer_changed.add(timer_app)
             self.logger.debug(f'Viessmann timer dict: {self._viess_timer_dict}')
 
 #
@@ -1295,12 +2296,42 @@ class Viessmann(SmartPlugin):
         commandcode = (commandconf['addr']).lower()
         commandvaluebytes = commandconf['len']
 
+        valuebytes = None
         if write:
             valuebytes = self._build_valuebytes_from_value(value, commandconf)
             # can't write 'no value'...
             if not valuebytes:
                 return (None, 0)
 
+        (packet, responselen) = self._build_packet(commandcode, commandvaluebytes, valuebytes, KWFollowUp)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            if write:
+                self.logger.debug(f'Created command {commandname} to be sent as hexstring: {self._bytes2hexstring(packet)} and as bytes: {packet} with value {value} (transformed to value byte {self._bytes2hexstring(valuebytes)})')
+            else:
+                self.logger.debug(f'Created command {commandname} to be sent as hexstring: {self._bytes2hexstring(packet)} and as bytes: {packet}')
+
+        return (packet, responselen)
+
+    def _build_packet(self, commandcode, commandvaluebytes, valuebytes=None, KWFollowUp=False):
+        '''
+        Create formatted command sequence for given address and data length.
+        If valuebytes is None, a read packet will be built, a write packet otherwise
+
+        :param commandcode: address of command
+        :type commandcode: str
+        :param commandvaluebytes: number of value bytes to read or write
+        :type commandvaluebytes: int
+        :param valuebytes: value bytes to write
+        :type valuebytes: bytes
+        :param KWFollowUp: create read sequence for KW protocol if multiple read commands will be sent without individual sync
+        :type KWFollowUp: bool
+        :return: tuple of (command sequence, expected response len)
+        :rtype: tuple (bytearray, int)
+        '''
+        write = valuebytes is not None
+
+        if write:
             # Calculate length of payload (only needed for P300)
             payloadlength = int(self._controlset.get('Command_bytes_write', 0)) + int(commandvaluebytes)
             self.logger.debug(f'Payload length is: {payloadlength} bytes')
@@ -1341,14 +2372,9 @@ class Viessmann(SmartPlugin):
         else:
             responselen = 1 if write else int(commandvaluebytes)
 
-        if write:
-            self.logger.debug(f'Created command {commandname} to be sent as hexstring: {self._bytes2hexstring(packet)} and as bytes: {packet} with value {value} (transformed to value byte {self._bytes2hexstring(valuebytes)})')
-        else:
-            self.logger.debug(f'Created command {commandname} to be sent as hexstring: {self._bytes2hexstring(packet)} and as bytes: {packet}')
-
         return (packet, responselen)
 
-    def _parse_response(self, response, commandname='', read_response=True):
+    def _parse_response(self, response, commandname='', read_response=True, fault_log=False):
         '''
         Process device response data, try to parse type and value
 
@@ -1358,18 +2384,24 @@ class Viessmann(SmartPlugin):
         :type commandname: str
         :param read_response: True if command was read command and value is expected, False if only status byte is expected (only needed for KW protocol)
         :type read_response: bool
+        :param fault_log: True if error entries should be added to the fault log
+        :type fault_log: bool
         :return: tuple of (parsed response value, commandcode) or None if error
         '''
+        # slice the received frame without copying
+        frame = memoryview(response)
+
         if self._protocol == 'P300':
 
             # A read_response telegram looks like this: ACK (1 byte), startbyte (1 byte), data length in bytes (1 byte), request/response (1 byte), read/write (1 byte), addr (2 byte), amount of valuebytes (1 byte), value (bytes as per last byte), checksum (1 byte)
             # A write_response telegram looks like this: ACK (1 byte), startbyte (1 byte), data length in bytes (1 byte), request/response (1 byte), read/write (1 byte), addr (2 byte), amount of bytes written (1 byte), checksum (1 byte)
 
             # Validate checksum
-            checksum = self._calc_checksum(response[1:len(response) - 1])  # first, cut first byte (ACK) and last byte (checksum) and then calculate checksum
+            checksum = self._calc_checksum(frame[1:len(response) - 1])  # first, cut first byte (ACK) and last byte (checksum) and then calculate checksum
             received_checksum = response[len(response) - 1]
             if received_checksum != checksum:
                 self.logger.error(f'Calculated checksum {checksum} does not match received checksum of {received_checksum}! Ignoring reponse')
+                self._metrics.count('checksum_errors', commandname or self._commandname_by_commandcode(response[5:7].hex()))
                 return None
 
             # Extract command/address, valuebytes and valuebytecount out of response
@@ -1379,8 +2411,7 @@ class Viessmann(SmartPlugin):
             valuebytecount = response[7]
 
             # Extract databytes out of response
-            rawdatabytes = bytearray()
-            rawdatabytes.extend(response[8:8 + (valuebytecount)])
+            rawdatabytes = frame[8:8 + valuebytecount]
         elif self._protocol == 'KW':
 
             # imitate P300 response code data for easier combined handling afterwards
@@ -1393,7 +2424,7 @@ class Viessmann(SmartPlugin):
             responsetypecode = 1
             commandcode = self._commandset[commandname]['addr'].lower()
             valuebytecount = len(response)
-            rawdatabytes = response
+            rawdatabytes = frame
 
             if read_response:
                 # value response to read request, error detection by empty = no response
@@ -1408,8 +2439,9 @@ class Viessmann(SmartPlugin):
                     # error if status reply is not 0x00
                     responsetypecode = 3
 
-        self.logger.debug(f'Response decoded to: commandcode: {commandcode}, responsedatacode: {responsedatacode}, valuebytecount: {valuebytecount}, responsetypecode: {responsetypecode}')
-        self.logger.debug(f'Rawdatabytes formatted: {self._bytes2hexstring(rawdatabytes)} and unformatted: {rawdatabytes}')
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f'Response decoded to: commandcode: {commandcode}, responsedatacode: {responsedatacode}, valuebytecount: {valuebytecount}, responsetypecode: {responsetypecode}')
+            self.logger.debug(f'Rawdatabytes formatted: {self._bytes2hexstring(rawdatabytes)} and unformatted: {bytes(rawdatabytes)}')
 
         # Process response for items if read response and not error
         if responsedatacode == 1 and responsetypecode != 3:
@@ -1420,86 +2452,281 @@ class Viessmann(SmartPlugin):
                 self.logger.error(f'Received response for unknown address point {commandcode}')
                 return None
 
-            # Get command and respective unit config
-            commandconf = self._commandset[commandname]
-            commandvaluebytes = commandconf['len']
-            commandunit = commandconf['unit']
-            unitconf = self._unitset.get(commandunit)
-            if not unitconf:
-                self.logger.error(f'Unit configuration not found for unit {commandunit} in protocol {self._protocol}. This is a configuration error in commands.py, please fix')
+            value = self._decode_value(rawdatabytes, commandname)
+            if value is None:
                 return None
-            commandsigned = unitconf['signed']
-            valuetransform = unitconf['read_value_transform']
-
-            # start value decode
-            if commandunit == 'CT':
-                timer = self._decode_timer(rawdatabytes.hex())
-                # fill list
-                timer = [{'An': on_time, 'Aus': off_time}
-                         for on_time, off_time in zip(timer, timer)]
-                value = timer
-                self.logger.debug(f'Matched command {commandname} and read transformed timer {value} and byte length {commandvaluebytes}')
-            elif commandunit == 'TI':
-                # decode datetime
-                value = datetime.strptime(rawdatabytes.hex(), '%Y%m%d%W%H%M%S').isoformat()
-                self.logger.debug(f'Matched command {commandname} and read transformed datetime {value} and byte length {commandvaluebytes}')
-            elif commandunit == 'DA':
-                # decode date
-                value = datetime.strptime(rawdatabytes.hex(), '%Y%m%d%W%H%M%S').date().isoformat()
-                self.logger.debug(f'Matched command {commandname} and read transformed datetime {value} and byte length {commandvaluebytes}')
-            elif commandunit == 'ES':
-                # erstes Byte = Fehlercode; folgenden 8 Byte = Systemzeit
-                errorcode = (rawdatabytes[:1]).hex()
-                # errorquerytime = (rawdatabytes[1:8]).hex()
-                value = self._error_decode(errorcode)
-                self.logger.debug(f'Matched command {commandname} and read transformed errorcode {value} (raw value was {errorcode}) and byte length {commandvaluebytes}')
-            elif commandunit == 'SC':
-                # erstes Byte = Anlagenschema
-                systemschemescode = (rawdatabytes[:1]).hex()
-                value = self._systemscheme_decode(systemschemescode)
-                self.logger.debug(f'Matched command {commandname} and read transformed system scheme {value} (raw value was {systemschemescode}) and byte length {commandvaluebytes}')
-            elif commandunit == 'BA':
-                operatingmodecode = (rawdatabytes[:1]).hex()
-                value = self._operatingmode_decode(operatingmodecode)
-                self.logger.debug(f'Matched command {commandname} and read transformed operating mode {value} (raw value was {operatingmodecode}) and byte length {commandvaluebytes}')
-            elif commandunit == 'DT':
-                # device type has 8 bytes, but first 4 bytes are device type indicator
-                devicetypebytes = rawdatabytes[:2].hex()
-                value = self._devicetype_decode(devicetypebytes).upper()
-                self.logger.debug(f'Matched command {commandname} and read transformed device type {value} (raw value was {devicetypebytes}) and byte length {commandvaluebytes}')
-            elif commandunit == 'SN':
-                # serial number has 7 bytes,
-                serialnumberbytes = rawdatabytes[:7]
-                value = self._serialnumber_decode(serialnumberbytes)
-                self.logger.debug(f'Matched command {commandname} and read transformed device type {value} (raw value was {serialnumberbytes}) and byte length {commandvaluebytes}')
-            elif commandunit == 'HEX':
-                # hex string for debugging purposes
-                hexstr = rawdatabytes.hex()
-                value = ' '.join([hexstr[i:i + 2] for i in range(0, len(hexstr), 2)])
-                self.logger.debug(f'Read hex bytes {value}')
-            else:
-                rawvalue = self._bytes2int(rawdatabytes, commandsigned)
-                value = self._value_transform_read(rawvalue, valuetransform)
-                self.logger.debug(f'Matched command {commandname} and read transformed value {value} (integer raw value was {rawvalue}) and byte length {commandvaluebytes}')
 
-            # assign to dict for use by other functions
-            self._last_values[commandcode] = value
+            if fault_log and self._commandset[commandname]['unit'] == 'ES':
+                (errorcode, errortime) = self._decode_error_entry(rawdatabytes)
+                self._update_fault_log(commandcode, errorcode, value, errortime)
+
+            # assign to dict for use by other functions, values of temporary commands are no device history
+            self._store_value(commandcode, value, commandname != 'temp_cmd')
 
             return (value, commandcode)
 
         # Handling of write command response if not error
         elif responsedatacode == 2 and responsetypecode != 3:
             self.logger.debug(f'Write request of adress {commandcode} successfull writing {valuebytecount} bytes')
+            # cached value is outdated now; keep the value, but mark it as never read
+            with self._value_lock:
+                if commandcode in self._last_values_time:
+                    self._last_values_time[commandcode] = 0
             return True
         else:
             self.logger.error(f'Write request of adress {commandcode} NOT successfull writing {valuebytecount} bytes')
             return None
 
+    def _decode_value(self, rawdatabytes, commandname):
+        '''
+        Decode raw value bytes according to command and unit config
+
+        :param rawdatabytes: Value bytes received from device
+        :type rawdatabytes: bytearray or memoryview
+        :param commandname: Command as defined in commands.py
+        :type commandname: str
+        :return: decoded value or None if error
+        '''
+        # Get command and respective unit config
+        commandconf = self._commandset[commandname]
+        commandvaluebytes = commandconf['len']
+        commandunit = commandconf['unit']
+        unitconf = self._unitset.get(commandunit)
+        if not unitconf:
+            self.logger.error(f'Unit configuration not found for unit {commandunit} in protocol {self._protocol}. This is a configuration error in commands.py, please fix')
+            return None
+        commandsigned = unitconf['signed']
+        valuetransform = unitconf['read_value_transform']
+
+        # start value decode
+        if commandunit == 'CT':
+            timer = self._decode_timer(rawdatabytes)
+            # fill list
+            timer = [{'An': on_time, 'Aus': off_time}
+                     for on_time, off_time in zip(timer, timer)]
+            value = timer
+            self.logger.debug(f'Matched command {commandname} and read transformed timer {value} and byte length {commandvaluebytes}')
+        elif commandunit == 'TI':
+            # decode datetime
+            value = self._decode_datetime(rawdatabytes).isoformat()
+            self.logger.debug(f'Matched command {commandname} and read transformed datetime {value} and byte length {commandvaluebytes}')
+        elif commandunit == 'DA':
+            # decode date
+            value = self._decode_datetime(rawdatabytes).date().isoformat()
+            self.logger.debug(f'Matched command {commandname} and read transformed datetime {value} and byte length {commandvaluebytes}')
+        elif commandunit == 'ES':
+            (errorcode, errortime) = self._decode_error_entry(rawdatabytes)
+            value = self._error_decode(errorcode)
+            self.logger.debug(f'Matched command {commandname} and read transformed errorcode {value} at {errortime} (raw value was {errorcode}) and byte length {commandvaluebytes}')
+        elif commandunit == 'SC':
+            # erstes Byte = Anlagenschema
+            systemschemescode = f'{rawdatabytes[0]:02x}'
+            value = self._systemscheme_decode(systemschemescode)
+            self.logger.debug(f'Matched command {commandname} and read transformed system scheme {value} (raw value was {systemschemescode}) and byte length {commandvaluebytes}')
+        elif commandunit == 'BA':
+            operatingmodecode = f'{rawdatabytes[0]:02x}'
+            value = self._operatingmode_decode(operatingmodecode)
+            self.logger.debug(f'Matched command {commandname} and read transformed operating mode {value} (raw value was {operatingmodecode}) and byte length {commandvaluebytes}')
+        elif commandunit == 'DT':
+            # device type has 8 bytes, but first 4 bytes are device type indicator
+            devicetypebytes = f'{rawdatabytes[0]:02x}{rawdatabytes[1]:02x}'
+            value = self._devicetype_decode(devicetypebytes).upper()
+            self.logger.debug(f'Matched command {commandname} and read transformed device type {value} (raw value was {devicetypebytes}) and byte length {commandvaluebytes}')
+        elif commandunit == 'SN':
+            # serial number has 7 bytes,
+            serialnumberbytes = rawdatabytes[:7]
+            value = self._serialnumber_decode(serialnumberbytes)
+            self.logger.debug(f'Matched command {commandname} and read transformed device type {value} (raw value was {bytes(serialnumberbytes)}) and byte length {commandvaluebytes}')
+        elif commandunit == 'HEX':
+            # hex string for debugging purposes
+            hexstr = rawdatabytes.hex()
+            value = ' '.join([hexstr[i:i + 2] for i in range(0, len(hexstr), 2)])
+            self.logger.debug(f'Read hex bytes {value}')
+        else:
+            rawvalue = self._bytes2int(rawdatabytes, commandsigned)
+            value = self._value_transform_read(rawvalue, valuetransform)
+            self.logger.debug(f'Matched command {commandname} and read transformed value {value} (integer raw value was {rawvalue}) and byte length {commandvaluebytes}')
+
+        return value
+
+    def _decode_error_entry(self, rawdatabytes):
+        '''
+        Decode error code and time of an error entry (unit ES)
+
+        :param rawdatabytes: Value bytes received from device
+        :type rawdatabytes: bytearray or memoryview
+        :return: tuple of (error code as hex string, time of error in iso format or None)
+        :rtype: tuple
+        '''
+        # erstes Byte = Fehlercode; folgenden 8 Byte = Systemzeit
+        errorcode = f'{rawdatabytes[0]:02X}'
+        try:
+            errortime = self._decode_datetime(rawdatabytes[1:9]).isoformat()
+        except ValueError:
+            # no valid time, e.g. empty entry
+            errortime = None
+        return (errorcode, errortime)
+
+    def _store_value(self, commandcode, value, history=True):
+        '''
+        Store parsed value and time of reading for use by other functions
+
+        :param commandcode: address of command
+        :type commandcode: str
+        :param value: parsed value
+        :param history: True if numeric values should be added to the value history
+        :type history: bool
+        '''
+        now = time.time()
+        with self._value_lock:
+            if commandcode not in self._last_values or self._last_values[commandcode] != value:
+                self._value_seq += 1
+                self._last_values_seq[commandcode] = self._value_seq
+            self._last_values[commandcode] = value
+            self._last_values_time[commandcode] = now
+            if history and self._history_size and isinstance(value, (int, float)):
+                if commandcode not in self._history:
+                    self._history[commandcode] = HistoryRing(self._history_size)
+                self._history[commandcode].append(now, value)
+        if history and self._history_file is not None and isinstance(value, (int, float)):
+            self._history_file.append(now, int(commandcode, 16), value)
+        if commandcode in self._rate_items and isinstance(value, (int, float)):
+            self._update_rate_items(commandcode, now, value)
+
+    def _get_changed_values(self, since=0):
+        '''
+        Return values changed after the given sequence number
+
+        :param since: sequence number of last known change
+        :type since: int
+        :return: tuple of (current sequence number, dict of command codes with command name, value and time of last read)
+        :rtype: tuple
+        '''
+        with self._value_lock:
+            # sequence number from before a restart, send everything
+            if since > self._value_seq:
+                since = 0
+            changed = {}
+            for commandcode, seq in self._last_values_seq.items():
+                if seq > since:
+                    changed[commandcode] = {'cmd': self._commandname_by_commandcode(commandcode), 'val': self._last_values.get(commandcode), 'time': self._last_values_time.get(commandcode, 0)}
+            return (self._value_seq, changed)
+
+    def _get_maxage(self, commandcode):
+        '''
+        Find maximum age of cached values for given command address
+
+        :param commandcode: address of command
+        :type commandcode: str
+        :return: maximum age in seconds, 0 if cached values should not be used
+        :rtype: float
+        '''
+        if commandcode in self._read_maxage:
+            return self._read_maxage[commandcode]
+        if commandcode in self._cyclic_cmds:
+            return self._cyclic_cmds[commandcode]['cycle']
+        return self._default_maxage
+
+    def _update_rate_items(self, commandcode, timestamp, value):
+        '''
+        Update rates of counter value and assign them to items configured with viess_rate
+
+        :param commandcode: address of command
+        :type commandcode: str
+        :param timestamp: time of reading
+        :type timestamp: float
+        :param value: counter value
+        :type value: float
+        '''
+        for rateconf in self._rate_items[commandcode]:
+            rate = rateconf['rate'].update(timestamp, value)
+            if rate is not None:
+                rateconf['item'](rate * rateconf['factor'], self.get_shortname())
+
+    def _get_fault_commandcodes(self):
+        '''
+        Find addresses of error entries (unit ES), newest entry first
+
+        :return: list of command codes
+        :rtype: list
+        '''
+        return self._fault_commandcodes
+
+    def _update_fault_log(self, commandcode, errorcode, errortext, errortime):
+        '''
+        Add error entry to fault log if not known yet and assign fault log to items
+        configured with viess_fault_log.
+        If fault_log_gated is set, a change of the newest error entry triggers reading
+        all other error entries on the next cyclic run.
+
+        :param commandcode: address of error entry
+        :type commandcode: str
+        :param errorcode: error code as hex string
+        :type errorcode: str
+        :param errortext: decoded error code
+        :type errortext: str
+        :param errortime: time of error in iso format or None
+        :type errortime: str
+        '''
+        with self._value_lock:
+            previous = self._fault_entries.get(commandcode)
+            self._fault_entries[commandcode] = (errorcode, errortime)
+            if self._fault_log_gated and previous != (errorcode, errortime) and commandcode == self._get_fault_commandcodes()[0]:
+                self.logger.info(f'Newest error entry changed to {errortext} at {errortime}, reading error history')
+                self._fault_fetch_pending = True
+
+            # code 00 means no error
+            if errorcode == '00' or any(entry['code'] == errorcode and entry['time'] == errortime for entry in self._fault_log):
+                return
+
+            self.logger.info(f'New error entry {errorcode} ({errortext}) at {errortime}')
+            self._fault_log.append({'code': errorcode, 'text': errortext, 'time': errortime, 'read': datetime.now().isoformat()})
+            self._fault_log.sort(key=lambda entry: entry['time'] or '', reverse=True)
+            del self._fault_log[self.FAULT_LOG_SIZE:]
+            fault_log = [dict(entry) for entry in self._fault_log]
+
+        for item in self._fault_log_items:
+            item(fault_log, self.get_shortname())
+
+    def _read_fault_entries(self):
+        '''
+        Read all error entries except the newest one, used if fault_log_gated is set
+        '''
+        self._fault_fetch_pending = False
+        for commandcode in self._get_fault_commandcodes()[1:]:
+            if not self.alive:
+                return
+            if commandcode in self._params:
+                self._send_command(self._params[commandcode]['commandname'])
+                continue
+
+            # no item configured, read entry for the fault log only
+            commandname = self._commandname_by_commandcode(commandcode)
+            (packet, responselen) = self._build_command_packet(commandname)
+            if packet is None:
+                continue
+            self._metrics.count('requests', commandname)
+            response_packet = self._send_command_packet(packet, responselen, commandname)
+            if response_packet is None or self._parse_response(response_packet, commandname, fault_log=True) is None:
+                self._metrics.count('errors', commandname)
+
+    def _update_metric_items(self):
+        '''
+        Mirror metric values to items configured with viess_metric
+        '''
+        for metric, items in self._metric_items.items():
+            value = self._metrics.get(metric)
+            if value is None:
+                continue
+            for item in items:
+                item(value, self.get_shortname())
+
     def _viess_dict_to_uzsu_dict(self):
         '''
         Convert data read from device to UZSU compatible struct.
         Input is taken from self._viess_timer_dict, output is written to
-        self._uzsu_dict
+        the UZSU items of the timer applications.
+        Only applications with changed timer values are processed.
         '''
         dict_timer = {}
         empty_time = '00:00'
@@ -1512,18 +2739,21 @@ class Viessmann(SmartPlugin):
             sunset = '21:00'
             sunrise = '06:00'
 
-        # convert all switching times with corresponding app and days to timer-dict
-        for application in self._viess_timer_dict:
-            if application not in dict_timer:
-                dict_timer[application] = {}
+        # convert all switching times of changed apps with corresponding days to timer-dict
+        for application in list(self._timer_changed):
+            self._timer_changed.discard(application)
+            if application not in self._viess_timer_dict or application not in self._application_timer:
+                continue
+            dict_timer[application] = {}
             for application_day in self._viess_timer_dict[application]:
                 timer = self._viess_timer_dict[application][application_day]
                 day = application_day[(application_day.rfind('_') + 1):len(application_day)].lower()
 
                 # normalize days
-                for element in self._wochentage:
-                    if day in self._wochentage[element]:
-                        weekday = element
+                weekday = self._weekday_lookup.get(day)
+                if weekday is None:
+                    self.logger.error(f'Could not find weekday for timer command {application_day}, ignoring')
+                    continue
 
                 for entry in timer:
                     for event, sw_time in entry.items():
@@ -1541,19 +2771,23 @@ class Viessmann(SmartPlugin):
         for application in dict_timer:
             item = self._application_timer[application]['item']
 
-            # read UZSU-dict (or use preset if empty)
-            uzsu_dict = item()
-            if not item():
-                uzsu_dict = {'lastvalue': '0', 'sunset': sunset, 'list': [], 'active': True, 'interpolation': {'initage': '', 'initialized': True, 'itemtype': 'bool', 'interval': '', 'type': 'none'}, 'sunrise': sunrise}
-
-            # create empty list
-            uzsu_dict['list'] = []
-
             # fill list with switching times
+            uzsu_list = []
             for sw_time in sorted(dict_timer[application].keys()):
                 for key in dict_timer[application][sw_time]:
                     rrule = 'FREQ=WEEKLY;BYDAY=' + ','.join(dict_timer[application][sw_time][key])
-                    uzsu_dict['list'].append({'time': sw_time, 'rrule': rrule, 'value': str(key), 'active': True})
+                    uzsu_list.append({'time': sw_time, 'rrule': rrule, 'value': str(key), 'active': True})
+
+            # read UZSU-dict (or use preset if empty)
+            if item():
+                if item().get('list') == uzsu_list:
+                    self.logger.debug(f'UZSU item {item} for timer application {application} unchanged, not updating')
+                    continue
+                uzsu_dict = dict(item())
+            else:
+                uzsu_dict = {'lastvalue': '0', 'sunset': sunset, 'list': [], 'active': True, 'interpolation': {'initage': '', 'initialized': True, 'itemtype': 'bool', 'interval': '', 'type': 'none'}, 'sunrise': sunrise}
+
+            uzsu_dict['list'] = uzsu_list
 
             # update item
             item(uzsu_dict, self.get_shortname())
@@ -1561,7 +2795,7 @@ class Viessmann(SmartPlugin):
     def _uzsu_dict_to_viess_timer(self, timer_app, uzsu_dict):
         '''
         Convert UZSU dict from item/visu for selected application into separate
-        on/off time events and write all timers to the device
+        on/off time events and write changed timers to the device
 
         :param timer_app: Application for which the timer should be written, as in commands.py
         :type timer_app: str
@@ -1610,24 +2844,26 @@ class Viessmann(SmartPlugin):
                 self.logger.debug(f'Commandname in process: {commandname}')
                 # create empty dict
                 timer_dict[commandname] = [{'An': '00:00', 'Aus': '00:00'}, {'An': '00:00', 'Aus': '00:00'}, {'An': '00:00', 'Aus': '00:00'}, {'An': '00:00', 'Aus': '00:00'}]
-                # get current day
+                # get current day and normalize it
                 wday = commandname[(commandname.rfind('_') + 1):len(commandname)].lower()
-                # normalize day
-                for element in self._wochentage:
-                    if wday in self._wochentage[element]:
-                        wday = element
+                wday = self._weekday_lookup.get(wday, wday)
                 # transfer switching times
-                for idx, val in enumerate(an[wday]):
+                for idx, val in enumerate(an.get(wday, [])):
                     timer_dict[commandname][idx]['An'] = val
-                for idx, val in enumerate(aus[wday]):
+                for idx, val in enumerate(aus.get(wday, [])):
                     timer_dict[commandname][idx]['Aus'] = val
             self.logger.debug(f'Timer-dict for update of items: {timer_dict}')
 
-            # write all timer dicts to device
-            for commandname in timer_dict:
+            # write only timer dicts which differ from the last known device state
+            current_timers = self._viess_timer_dict.setdefault(timer_app, {})
+            for commandname in sorted(timer_dict):
                 value = timer_dict[commandname]
+                if current_timers.get(commandname) == value:
+                    self.logger.debug(f'Timer for command name {commandname} unchanged, not writing')
+                    continue
                 self.logger.debug(f'Got item value to be written: {value} on command name {commandname}')
-                self._send_command(commandname, value)
+                if self._send_command(commandname, value):
+                    current_timers[commandname] = value
 
     def _calc_checksum(self, packet):
         '''
@@ -1717,17 +2953,39 @@ class Viessmann(SmartPlugin):
         Generator to convert byte sequence to a number of time strings hh:mm
 
         :param rawdatabytes: Bytes to convert
-        :type rawdatabytes: bytearray
+        :type rawdatabytes: bytearray or memoryview
         '''
-        while rawdatabytes:
-            hours, minutes = divmod(int(rawdatabytes[:2], 16), 8)
+        for byte in rawdatabytes:
+            # bits 7-3 are hours, bits 2-0 are tens of minutes
+            hours = byte >> 3
+            minutes = byte & 0x07
             if minutes >= 6 or hours >= 24:
                 # not a valid time
                 yield '00:00'
             else:
                 yield f'{hours:02d}:{(minutes * 10):02d}'
-            rawdatabytes = rawdatabytes[2:]
-        return None
+
+    def _decode_datetime(self, rawdatabytes):
+        '''
+        Convert BCD encoded date and time (YYYY MM DD weekday hh mm ss) to datetime
+
+        :param rawdatabytes: 8 bytes to convert
+        :type rawdatabytes: bytearray or memoryview
+        :return: Converted date and time
+        :rtype: datetime
+        :raises ValueError: if bytes are no valid BCD date and time
+        '''
+        if len(rawdatabytes) < 8:
+            raise ValueError(f'{len(rawdatabytes)} bytes are too short for date and time')
+        digits = []
+        for byte in rawdatabytes[:8]:
+            high = byte >> 4
+            low = byte & 0x0f
+            if high > 9 or low > 9:
+                raise ValueError(f'invalid BCD byte {byte:02x}')
+            digits.append(high * 10 + low)
+        # weekday (digits[4]) is implied by the date and ignored
+        return datetime(digits[0] * 100 + digits[1], digits[2], digits[3], digits[5], digits[6], digits[7])
 
     def _encode_timer(self, switching_time):
         '''
@@ -1820,9 +3078,8 @@ class Viessmann(SmartPlugin):
         Decode serial number from device response
         '''
         serialnumber = 0
-        serialnumberbytes.reverse()
-        for byte in range(0, len(serialnumberbytes)):
-            serialnumber += (serialnumberbytes[byte] - 48) * 10 ** byte
+        for position, byte in enumerate(reversed(serialnumberbytes)):
+            serialnumber += (byte - 48) * 10 ** position
         return hex(serialnumber).upper()
 
     def _commandname_by_commandcode(self, commandcode):
@@ -1916,8 +3173,6 @@ class WebInterface(SmartPluginWebIf):
         self.plugin = plugin
         self.tplenv = self.init_template_environment()
 
-        self.items = Items.get_instance()
-
         self.cmdset = cmdset
 
         self._last_read = {}
@@ -1927,6 +3182,13 @@ class WebInterface(SmartPluginWebIf):
         self._read_cmd = ''
         self._read_val = ''
 
+        # asynchronous read jobs
+        self._jobs = collections.OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._job_queue = queue.Queue()
+        self._job_lock = threading.Lock()
+        self._job_thread = None
+
     @cherrypy.expose
     def index(self, reload=None):
         '''
@@ -1939,180 +3201,235 @@ class WebInterface(SmartPluginWebIf):
         tmpl = self.tplenv.get_template('index.html')
         # add values to be passed to the Jinja2 template eg: tmpl.render(p=self.plugin, interface=interface, ...)
 
+        # only list items registered with this plugin
+        items = [{'item': entry['item'], 'commandcode': commandcode, 'commandname': entry['commandname']} for commandcode, entry in self.plugin._params.items()]
+        items.extend({'item': entry['item'], 'commandcode': ', '.join(entry['commandcodes']), 'commandname': timer_app} for timer_app, entry in self.plugin._application_timer.items())
+        items.sort(key=lambda entry: str.lower(entry['item'].path()))
+
         return tmpl.render(p=self.plugin,
-                           items=sorted(self.items.return_items(), key=lambda k: str.lower(k['_path'])),
+                           items=items,
                            cmds=self.cmdset,
                            units=sorted(list(self.plugin._unitset.keys())),
+                           bus=self.plugin._bus_budget,
                            last_read_addr=self._last_read['last']['addr'],
                            last_read_value=self._last_read['last']['val'],
                            last_read_cmd=self._last_read['last']['cmd']
                            )
 
     @cherrypy.expose
-    def submit(self, button=None, addr=None, length=0, unit=None, clear=False):
-        '''
-        Submit handler for Ajax
-        '''
-        if button is not None:
-
-            read_val = self.plugin.read_addr(button)
-            if read_val is None:
-                self.logger.debug(f'Error trying to read addr {button} submitted by WebIf')
-                read_val = 'Fehler beim Lesen'
-            else:
-                read_cmd = self.plugin._commandname_by_commandcode(button)
-                if read_cmd is not None:
-                    self._last_read[button] = {'addr': button, 'cmd': read_cmd, 'val': read_val}
-                    self._last_read['last'] = self._last_read[button]
-
-        elif addr is not None and unit is not None and length.isnumeric():
-
-            read_val = self.plugin.read_temp_addr(addr, int(length), unit)
-            if read_val is None:
-                self.logger.debug(f'Error trying to read custom addr {button} submitted by WebIf')
-                read_val = 'Fehler beim Lesen'
-            else:
-                self._last_read[addr] = {'addr': addr, 'cmd': f'custom ({addr})', 'val': read_val}
-                self._last_read['last'] = self._last_read[addr]
+    def commands(self, draw=0, start=0, length=25, **kwargs):
+        '''
+        Deliver one page of the command table for DataTables server-side processing
+
+        :param draw: request counter, returned unchanged
+        :param start: index of first row
+        :param length: number of rows, -1 for all
+        :return: json encoded table page
+        '''
+        draw = self._get_number(draw)
+        start = self._get_number(start)
+        length = self._get_number(length, 25, minimum=-1)
+        search = kwargs.get('search[value]', '').lower()
+        column = self._get_number(kwargs.get('order[0][column]'))
+        reverse = kwargs.get('order[0][dir]', 'asc') == 'desc'
+
+        rows = [[cmd, conf['addr'], conf['len'], conf['unit'], conf['set']] for cmd, conf in self.cmdset.items()]
+        total = len(rows)
+        if search:
+            rows = [row for row in rows if search in row[0].lower() or search in row[1].lower() or search == row[3].lower()]
+        if column < 5:
+            rows.sort(key=lambda row: str(row[column]).lower(), reverse=reverse)
+        filtered = len(rows)
+        if length >= 0:
+            rows = rows[start:start + length]
+        else:
+            rows = rows[start:]
 
-        elif clear:
-            for addr in self._last_read:
-                self._last_read[addr]['val'] = ''
-            self._last_read['last'] = {'addr': None, 'val': '', 'cmd': ''}
+        # add last read values
+        for row in rows:
+            row.append(self._last_read.get(row[1], {}).get('val', ''))
 
         cherrypy.response.headers['Content-Type'] = 'application/json'
-        return json.dumps(self._last_read).encode('utf-8')
-
-
-# ------------------------------------------
-# The following code is for standalone use of the plugin to identify the device
-# ------------------------------------------
-
-def get_device_type(v, protocol):
-
-    # try to connect and read device type info from 0x00f8
-    print(f'Trying protocol {protocol} on device {serialport}')
-
-    # first, initialize Viessmann object for use
-    v.alive = True
-    v._protocol = protocol
-
-    # setup protocol controlset
-    v._controlset = commands.controlset[protocol]
-    res = v._connect()
-    if not res:
-        logger.info(f'Connection to {serialport} failed. Please check connection.')
-        return None
-
-    res = v._init_communication()
-    if not res:
-        logger.info(f'Could not initialize communication using protocol {protocol}.')
-        return False
+        return json.dumps({'draw': draw, 'recordsTotal': total, 'recordsFiltered': filtered, 'data': rows}).encode('utf-8')
 
-    # we are connected to the IR head
-
-    # set needed unit
-    v._unitset = {
-        'DT': {'unit_de': 'DeviceType', 'type': 'list', 'signed': False, 'read_value_transform': 'non'}
-    }
-
-    # set needed command. DeviceType command is (hopefully) the same in all devices...
-    v._commandset = {
-        'DT': {'addr': '00f8', 'len': 2, 'unit': 'DT', 'set': False},
-    }
-
-    # we leave this empty so we get the DT code back
-    v._devicetypes = {}
-
-    # this is protocol dependent, so easier to let the Class work this out...
-    (packet, responselen) = v._build_command_packet('DT')
-    if packet is None:
-        raise ValueError('No command packet received for address 00f8. This shouldn\'t happen...')
-
-    # send it
-    response_packet = v._send_command_packet(packet, responselen)
-    if response_packet is None:
-        raise ValueError('Error on communicating with the device, no response received. Unknown error.')
-
-    # let it go...
-    v._disconnect()
+    @cherrypy.expose
+    def values(self, since=0):
+        '''
+        Deliver datapoints changed since the given sequence number from cache, no values are read from the device
 
-    (val, code) = v._parse_response(response_packet, 'DT')
+        :param since: sequence number returned by the last call
+        :return: json encoded dict with current sequence number and changed values
+        '''
+        (seq, changed) = self.plugin._get_changed_values(self._get_number(since))
+        cherrypy.response.headers['Content-Type'] = 'application/json'
+        return json.dumps({'seq': seq, 'values': changed}, default=str).encode('utf-8')
 
-    if val is not None:
-        return val
-    else:
-        return None
+    @cherrypy.expose
+    def history(self, addr=None, window=0, points=100):
+        '''
+        Deliver history of numeric values of a datapoint, no values are read from the device
 
+        :param addr: datapoint address
+        :param window: only deliver values of the last window seconds, 0 for all values
+        :param points: maximum number of (averaged) values
+        :return: json encoded dict with statistics, times and values, see get_history()
+        '''
+        cherrypy.response.headers['Content-Type'] = 'application/json'
+        return json.dumps(self.plugin.get_history(addr or '', self._get_number(window, numtype=float), self._get_number(points, 100))).encode('utf-8')
 
-if __name__ == '__main__':
+    @cherrypy.expose
+    def submit(self, button=None, addr=None, length=0, unit=None, clear=False, addrs=None):
+        '''
+        Submit handler for Ajax
 
-    usage = '''
-    Usage:
-    ----------------------------------------------------------------------------------
+        Read requests are queued as job and processed in the background,
+        the job id is returned immediately and results can be polled with job()
+        '''
+        if button is not None:
+            return self._json({'job': self._queue_job([{'addr': button}])})
 
-    This plugin is meant to be used inside SmartHomeNG.
+        elif addrs is not None:
+            return self._json({'job': self._queue_job([{'addr': entry} for entry in addrs.split(',') if entry])})
 
-    For diagnostic purposes, you can run it as a standalone Python program from the
-    command line. It will try to communicate with a connected Viessmann heating system
-    and return the device type and the necessary protocol for setting up your plugin
-    in SmartHomeNG.
+        elif addr is not None and unit is not None and length.isnumeric():
+            return self._json({'job': self._queue_job([{'addr': addr, 'length': int(length), 'unit': unit}])})
 
-    You need to call this plugin with the serial interface as the first parameter, e.g.
+        elif clear:
+            with self._job_lock:
+                for addr in self._last_read:
+                    self._last_read[addr]['val'] = ''
+                self._last_read['last'] = {'addr': None, 'val': '', 'cmd': ''}
 
-    ./__init__.py /dev/ttyUSB0
+        with self._job_lock:
+            return self._json(self._last_read)
 
-    If you call it with -v as a second parameter, you get additional debug information:
+    @cherrypy.expose
+    def scan(self, action=None, start='0000', end='ffff', length='2', blocksize='16'):
+        '''
+        Start or stop address scan and return scan status
 
-    ./__init__.py /dev/ttyUSB0 -v
+        :param action: 'start' or 'stop', None to only return status
+        :return: json encoded scan status
+        '''
+        if action == 'start' and length.isnumeric() and blocksize.isnumeric():
+            self.plugin.start_scan(start, end, int(length), int(blocksize))
+        elif action == 'stop':
+            self.plugin.stop_scan()
+        return self._json(self.plugin.get_scan_status())
 
-    '''
+    @cherrypy.expose
+    def job(self, id=0):
+        '''
+        Return state of read job and all read values
 
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.CRITICAL)
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
+        :param id: job id as returned by submit()
+        :return: json encoded dict with job state, job results and all read values
+        '''
+        with self._job_lock:
+            job = self._jobs.get(self._get_number(id))
+            if job is None:
+                return self._json({'state': 'unknown'})
+            return self._json({'state': job['state'], 'results': job['results'], 'read': self._last_read})
 
-    # create formatter and add it to the handlers
-    formatter = logging.Formatter('%(asctime)s - %(message)s  @ %(lineno)d')
-    ch.setFormatter(formatter)
+    def _json(self, data):
+        cherrypy.response.headers['Content-Type'] = 'application/json'
+        return json.dumps(data, default=str).encode('utf-8')
 
-    # add the handlers to the logger
-    logger.addHandler(ch)
+    def _get_number(self, value, default=0, minimum=0, numtype=int):
+        '''
+        Convert query parameter to number
 
-    serialport = ""
+        :param value: query parameter
+        :param default: value used if parameter is missing, not numeric or less than minimum
+        :param minimum: smallest valid value
+        :param numtype: int or float
+        :return: converted value or default
+        '''
+        try:
+            value = numtype(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value >= minimum else default
 
-    if len(sys.argv) == 2:
-        serialport = sys.argv[1]
-    elif len(sys.argv) == 3 and sys.argv[2] == '-v':
-        serialport = sys.argv[1]
-        logger.setLevel(logging.DEBUG)
-    else:
-        print(usage)
-        exit()
+    def _queue_job(self, reads):
+        '''
+        Queue read job and start worker thread if necessary
 
-    print("This is Viessmann plugin running in standalone mode")
-    print("===================================================")
+        :param reads: list of dicts with 'addr' and, for custom reads, 'length' and 'unit'
+        :type reads: list
+        :return: job id
+        :rtype: int
+        '''
+        with self._job_lock:
+            jobid = next(self._job_ids)
+            job = self._jobs[jobid] = {'state': 'queued', 'results': {}}
+            # only keep recent jobs, but never drop queued or running jobs
+            finished = [oldid for oldid in self._jobs if self._jobs[oldid]['state'] == 'done']
+            for oldid in finished[:max(0, len(self._jobs) - 20)]:
+                del self._jobs[oldid]
 
-    v = Viessmann(None, standalone=serialport, logger=logger)
+            if self._job_thread is None or not self._job_thread.is_alive():
+                self._job_thread = threading.Thread(target=self._job_worker, name=f'{self.plugin.get_shortname()}_webif_jobs', daemon=True)
+                self._job_thread.start()
 
-    for proto in ('P300', 'KW'):
+        self._job_queue.put((jobid, job, reads))
+        return jobid
 
-        res = get_device_type(v, proto)
-        if res is None:
+    def _job_worker(self):
+        '''
+        Process queued read jobs one by one at low priority
+        '''
+        while True:
+            (jobid, job, reads) = self._job_queue.get()
+            with self._job_lock:
+                job['state'] = 'running'
 
-            # None means no connection, no further tries
-            print(f'Connection could not be established to {serialport}. Please check connection.')
-            break
+            try:
+                self._run_job(job, reads)
+            except Exception as e:
+                self.logger.error(f'Read job {jobid} submitted by WebIf failed: {e}')
+            finally:
+                with self._job_lock:
+                    job['state'] = 'done'
+
+    def _run_job(self, job, reads):
+        '''
+        Read the addresses of a job and store the results in the job dict
+
+        :param job: job dict with 'results'
+        :type job: dict
+        :param reads: list of dicts with 'addr' and, for custom reads, 'length' and 'unit'
+        :type reads: list
+        '''
+        for read in reads:
+            # give way to cyclic reads
+            waited = 0
+            while self.plugin._cyclic_update_active and waited < 30:
+                time.sleep(0.1)
+                waited += 0.1
+
+            addr = read['addr']
+            if 'unit' in read:
+                read_val = self.plugin.read_temp_addr(addr, read['length'], read['unit'])
+                read_cmd = f'custom ({addr})'
+            else:
+                read_val = self.plugin.read_addr(addr)
+                read_cmd = self.plugin._commandname_by_commandcode(addr.lower())
 
-        if res is False:
+            with self._job_lock:
+                if read_val is None or read_cmd is None:
+                    self.logger.debug(f'Error trying to read addr {addr} submitted by WebIf')
+                    job['results'][addr] = 'Fehler beim Lesen'
+                else:
+                    self._last_read[addr] = {'addr': addr, 'cmd': read_cmd, 'val': read_val}
+                    self._last_read['last'] = self._last_read[addr]
+                    job['results'][addr] = read_val
 
-            # False means no comm init (only P300), go on
-            print(f'Communication could not be established using protocol {proto}.')
-        else:
 
-            # anything else should be the devices answer, try to decode and quit
-            print(f'Device ID is {res}, device type is {commands.devicetypes.get(res, "unknown")} using protocol {proto}')
-            # break
+# ------------------------------------------
+# The following code is for standalone use of the plugin to identify the device
+# ------------------------------------------
 
-    print('Done.')
+if __name__ == '__main__':
+    from standalone import main
+    main(Viessmann)
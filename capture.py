@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+import collections
+import logging
+import struct
+import time
+
+
+CAPTURE_HEADER = b'VIESSCAP1\n'
+CAPTURE_RECORD = struct.Struct('<QBH')          # monotonic timestamp in ns, direction, data length
+CAPTURE_TX = 0
+CAPTURE_RX = 1
+
+
+def read_capture(filename):
+    '''
+    Read records from capture file
+
+    :param filename: name of capture file
+    :type filename: str
+    :return: generator of tuples (timestamp in ns, direction, data)
+    '''
+    with open(filename, 'rb') as capture:
+        if capture.read(len(CAPTURE_HEADER)) != CAPTURE_HEADER:
+            raise ValueError(f'{filename} is not a capture file')
+        while True:
+            header = capture.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+            (timestamp, direction, length) = CAPTURE_RECORD.unpack(header)
+            data = capture.read(length)
+            if len(data) < length:
+                return
+            yield (timestamp, direction, data)
+
+
+class CaptureSerial():
+    '''
+    Wraps a serial connection and records all sent and received bytes to a capture file.
+
+    Each record consists of a monotonic timestamp, the direction and the data.
+    Only bytes actually returned by read() are recorded, empty reads (timeouts) are skipped.
+    '''
+
+    def __init__(self, port, filename):
+        self._port = port
+        self._capture = open(filename, 'ab')
+        if self._capture.tell() == 0:
+            self._capture.write(CAPTURE_HEADER)
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+    def write(self, data):
+        self._record(CAPTURE_TX, data)
+        return self._port.write(data)
+
+    def read(self, size=1):
+        data = self._port.read(size)
+        if data:
+            self._record(CAPTURE_RX, data)
+        return data
+
+    def close(self):
+        try:
+            self._port.close()
+        finally:
+            self._capture.close()
+
+    def _record(self, direction, data):
+        self._capture.write(CAPTURE_RECORD.pack(time.monotonic_ns(), direction, len(data)) + bytes(data))
+        self._capture.flush()
+
+
+class ReplaySerial():
+    '''
+    Serial port replacement, which plays back a capture file instead of using hardware.
+
+    Received data is released in the captured order after the preceding sent data
+    has been written. Sent data is compared to the capture and differences are logged.
+    '''
+
+    def __init__(self, filename, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._filename = filename
+        self._records = collections.deque()
+        self._rx = bytearray()
+        self.is_open = False
+
+    def open(self):
+        self._records.extend(read_capture(self._filename))
+        self.is_open = True
+        self._release()
+
+    def close(self):
+        self._records.clear()
+        self.is_open = False
+
+    def write(self, data):
+        if self._records and self._records[0][1] == CAPTURE_TX:
+            expected = self._records.popleft()[2]
+            if bytes(data) != expected:
+                self.logger.debug(f'Replay: sent {bytes(data).hex()} instead of captured {expected.hex()}')
+        else:
+            self.logger.debug(f'Replay: sent {bytes(data).hex()}, but capture expects no data to be sent')
+        self._release()
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self._rx[:size])
+        del self._rx[:size]
+        return data
+
+    def reset_input_buffer(self):
+        # captured data only contains bytes which were actually read, so nothing to discard
+        pass
+
+    def _release(self):
+        # make received data available up to the next sent data
+        while self._records and self._records[0][1] == CAPTURE_RX:
+            self._rx.extend(self._records.popleft()[2])
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+import array
+import collections
+import mmap
+import os
+import struct
+import threading
+
+
+class HistoryRing():
+    '''
+    Fixed-size ring buffer of timestamps and numeric values.
+
+    Timestamps and values are stored in two preallocated arrays of doubles. Appending
+    is O(1) and overwrites the oldest entry if the buffer is full. As timestamps are
+    appended in ascending order, time windows are found by binary search.
+    Not thread-safe, callers need to lock.
+    '''
+
+    def __init__(self, size):
+        self.size = size
+        self._times = array.array('d', bytes(8 * size))
+        self._values = array.array('d', bytes(8 * size))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        '''
+        Add value, overwriting the oldest value if full
+
+        :param timestamp: time of value in seconds since epoch
+        :type timestamp: float
+        :param value: numeric value
+        :type value: float
+        '''
+        pos = (self._start + self._count) % self.size
+        self._times[pos] = timestamp
+        self._values[pos] = value
+        if self._count < self.size:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % self.size
+
+    def window(self, start=None, end=None):
+        '''
+        Return values in time window
+
+        :param start: start of window in seconds since epoch, None for oldest value
+        :type start: float
+        :param end: end of window in seconds since epoch (including), None for newest value
+        :type end: float
+        :return: tuple of arrays of timestamps and values in ascending time order
+        :rtype: tuple
+        '''
+        first = 0 if start is None else self._find(start)
+        last = self._count if end is None else self._find(end, True)
+        return (self._slice(self._times, first, last), self._slice(self._values, first, last))
+
+    def stats(self, start=None, end=None):
+        '''
+        Return statistics of values in time window
+
+        :param start: start of window in seconds since epoch, None for oldest value
+        :type start: float
+        :param end: end of window in seconds since epoch, None for newest value
+        :type end: float
+        :return: dict with count, min, max, mean and time of first and last value
+        :rtype: dict
+        '''
+        (times, values) = self.window(start, end)
+        if not values:
+            return {'count': 0, 'min': None, 'max': None, 'mean': None, 'first': None, 'last': None}
+        return {'count': len(values), 'min': min(values), 'max': max(values), 'mean': sum(values) / len(values), 'first': times[0], 'last': times[-1]}
+
+    def downsample(self, points, start=None, end=None):
+        '''
+        Return values in time window averaged over equal time slices
+
+        :param points: number of time slices
+        :type points: int
+        :param start: start of window in seconds since epoch, None for oldest value
+        :type start: float
+        :param end: end of window in seconds since epoch, None for newest value
+        :type end: float
+        :return: tuple of lists of average timestamps and values of non-empty time slices
+        :rtype: tuple
+        '''
+        (times, values) = self.window(start, end)
+        if len(values) <= points:
+            return (list(times), list(values))
+
+        width = (times[-1] - times[0]) / points or 1
+        time_sums = [0.0] * points
+        value_sums = [0.0] * points
+        counts = [0] * points
+        for timestamp, value in zip(times, values):
+            index = min(int((timestamp - times[0]) / width), points - 1)
+            time_sums[index] += timestamp
+            value_sums[index] += value
+            counts[index] += 1
+        slices = [index for index in range(points) if counts[index]]
+        return ([time_sums[index] / counts[index] for index in slices], [value_sums[index] / counts[index] for index in slices])
+
+    def _find(self, timestamp, after=False):
+        # binary search for first logical index with time >= timestamp (> timestamp if after is set)
+        low = 0
+        high = self._count
+        while low < high:
+            mid = (low + high) // 2
+            value = self._times[(self._start + mid) % self.size]
+            if value < timestamp or (after and value == timestamp):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _slice(self, buffer, first, last):
+        # copy logical range, which may wrap around the end of the buffer
+        first += self._start
+        last += self._start
+        if first >= self.size:
+            return buffer[first - self.size:last - self.size]
+        if last <= self.size:
+            return buffer[first:last]
+        return buffer[first:] + buffer[:last - self.size]
+
+
+class CounterRate():
+    '''
+    Rate of change of a cumulative counter over a sliding time window.
+
+    Each reading adds its increase to a running total, so only one sample per
+    reading is kept. A decrease by more than half the counter range is treated
+    as wraparound, any other decrease as counter reset, which restarts the window.
+    '''
+    UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+    def __init__(self, window=3600, modulo=None):
+        self.window = window
+        self.modulo = modulo
+        self._samples = collections.deque()
+        self._total = 0
+        self._last = None
+
+    def update(self, timestamp, value):
+        '''
+        Add counter reading and return current rate
+
+        :param timestamp: time of reading in seconds
+        :type timestamp: float
+        :param value: counter value
+        :type value: float
+        :return: increase per second over the window, None if not enough readings
+        :rtype: float
+        '''
+        last = self._last
+        self._last = value
+        if last is None:
+            self._samples.append((timestamp, self._total))
+            return None
+
+        delta = value - last
+        if delta < 0:
+            if self.modulo and delta < -self.modulo / 2:
+                delta += self.modulo
+            else:
+                self._samples.clear()
+                self._samples.append((timestamp, self._total))
+                return None
+
+        self._total += delta
+        self._samples.append((timestamp, self._total))
+
+        # keep the last sample before the window as base
+        while len(self._samples) > 2 and self._samples[1][0] <= timestamp - self.window:
+            self._samples.popleft()
+
+        (starttime, starttotal) = self._samples[0]
+        if timestamp <= starttime:
+            return None
+        return (self._total - starttotal) / (timestamp - starttime)
+
+
+HISTORY_HEADER = b'VIESSHIS1\n'
+HISTORY_RECORD = struct.Struct('<dHd')          # timestamp in seconds since epoch, address, value
+
+
+def read_history(filename, start=None, end=None, addr=None):
+    '''
+    Read records from history file and its rotated predecessors in chronological order
+
+    :param filename: name of current history file
+    :type filename: str
+    :param start: start of time range in seconds since epoch, None for oldest record
+    :type start: float
+    :param end: end of time range in seconds since epoch (including), None for newest record
+    :type end: float
+    :param addr: only return records of this address
+    :type addr: int
+    :return: generator of tuples (timestamp, address, value)
+    '''
+    filenames = [filename]
+    while os.path.exists(f'{filename}.{len(filenames)}'):
+        filenames.insert(0, f'{filename}.{len(filenames)}')
+
+    for name in filenames:
+        try:
+            history = open(name, 'rb')
+        except FileNotFoundError:
+            continue
+        with history:
+            if history.read(len(HISTORY_HEADER)) != HISTORY_HEADER:
+                raise ValueError(f'{name} is not a history file')
+            count = (os.fstat(history.fileno()).st_size - len(HISTORY_HEADER)) // HISTORY_RECORD.size
+            if not count:
+                continue
+            with mmap.mmap(history.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+                # binary search for first record in time range
+                low = 0
+                high = count
+                while start is not None and low < high:
+                    mid = (low + high) // 2
+                    if HISTORY_RECORD.unpack_from(data, len(HISTORY_HEADER) + mid * HISTORY_RECORD.size)[0] < start:
+                        low = mid + 1
+                    else:
+                        high = mid
+
+                for offset in range(len(HISTORY_HEADER) + low * HISTORY_RECORD.size, len(HISTORY_HEADER) + count * HISTORY_RECORD.size, HISTORY_RECORD.size):
+                    record = HISTORY_RECORD.unpack_from(data, offset)
+                    if end is not None and record[0] > end:
+                        return
+                    if addr is None or record[1] == addr:
+                        yield record
+
+
+class HistoryFile():
+    '''
+    Appends numeric values as fixed-width records of timestamp, address and value
+    to a history file.
+
+    If the file grows beyond maxsize, it is renamed to <filename>.1, older files
+    are shifted to <filename>.2 and so on, keeping count files in total.
+    '''
+
+    def __init__(self, filename, maxsize=10 * 1024 * 1024, count=5, logger=None):
+        self.filename = filename
+        self.maxsize = maxsize
+        self.count = max(1, count)
+        self.logger = logger
+        self._file = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, addr, value):
+        '''
+        Append record, rotating files if necessary
+
+        :param timestamp: time of value in seconds since epoch
+        :type timestamp: float
+        :param addr: address of data point
+        :type addr: int
+        :param value: numeric value
+        :type value: float
+        '''
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                self._file.write(HISTORY_RECORD.pack(timestamp, addr, value))
+                self._file.flush()
+                if self._file.tell() >= self.maxsize:
+                    self._rotate()
+                self._error = None
+            except (OSError, ValueError) as e:
+                # log only once until writing succeeds again
+                if self.logger and str(e) != self._error:
+                    self.logger.error(f'Could not write to history file {self.filename}: {e}')
+                self._error = str(e)
+                self._close()
+
+    def close(self):
+        '''
+        Close history file, it is reopened on next append
+        '''
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        self._file = open(self.filename, 'ab')
+        size = self._file.tell()
+        if size == 0:
+            self._file.write(HISTORY_HEADER)
+            return
+
+        with open(self.filename, 'rb') as history:
+            if history.read(len(HISTORY_HEADER)) != HISTORY_HEADER:
+                raise ValueError('not a history file')
+
+        # drop incomplete record, e.g. after power failure
+        incomplete = (size - len(HISTORY_HEADER)) % HISTORY_RECORD.size
+        if incomplete:
+            self._file.truncate(size - incomplete)
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+
+    def _rotate(self):
+        self._close()
+        if self.count == 1:
+            os.remove(self.filename)
+            return
+        for index in range(self.count - 1, 0, -1):
+            source = self.filename if index == 1 else f'{self.filename}.{index - 1}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.filename}.{index}')
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+import collections
+import threading
+import time
+
+
+class RequestCancelled(Exception):
+    '''
+    Raised if a request to the device is cancelled because the plugin is
+    stopping or the deadline of the request has passed
+    '''
+    pass
+
+
+class FairLock():
+    '''
+    Reentrant lock which is granted to waiting threads in the order of their
+    acquire() calls.
+
+    threading.Lock and threading.RLock don't guarantee any order, so a thread
+    acquiring the lock in a loop (e.g. cyclic reads) can starve other callers.
+    '''
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._waiters = collections.deque()
+        self._owner = None
+        self._count = 0
+
+    def acquire(self, timeout=None, abort=None):
+        '''
+        Acquire the lock, waiting for all threads which called acquire() earlier
+
+        :param timeout: maximum time to wait in seconds, None to wait indefinitely
+        :type timeout: float
+        :param abort: function called after each wakeup, stop waiting if it returns True
+        :type abort: callable
+        :return: True if the lock was acquired, False on timeout or abort
+        :rtype: bool
+        '''
+        me = threading.get_ident()
+        with self._cond:
+            if self._owner == me:
+                self._count += 1
+                return True
+            endtime = None if timeout is None else time.monotonic() + timeout
+            self._waiters.append(me)
+            while self._owner is not None or self._waiters[0] != me:
+                remaining = None if endtime is None else endtime - time.monotonic()
+                if (remaining is not None and remaining <= 0) or (abort and abort()):
+                    self._waiters.remove(me)
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(remaining)
+            self._waiters.popleft()
+            self._owner = me
+            self._count = 1
+            return True
+
+    def release(self):
+        '''
+        Release the lock. Raises RuntimeError if the lock is not held by the calling thread.
+        '''
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError('cannot release lock held by another thread')
+            self._count -= 1
+            if not self._count:
+                self._owner = None
+                self._cond.notify_all()
+
+    def interrupt(self):
+        '''
+        Wake up all waiting threads to check their abort condition
+        '''
+        with self._cond:
+            self._cond.notify_all()
+
+    def locked(self):
+        return self._owner is not None
+
+    def waiting(self):
+        '''
+        :return: Number of threads waiting for the lock
+        :rtype: int
+        '''
+        return len(self._waiters)
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
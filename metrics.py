@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+import bisect
+import collections
+import functools
+import threading
+import time
+
+
+class ViessmannMetrics():
+    '''
+    Thread-safe collection of per-command counters and latency histograms.
+
+    Latencies are recorded per phase (queue wait, send, receive, parse, item update)
+    in milliseconds. Histogram buckets are given by their upper bound.
+    '''
+    PHASES = ('queue', 'send', 'receive', 'parse', 'item')
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    COUNTERS = ('requests', 'errors', 'timeouts', 'checksum_errors', 'bytes_sent', 'bytes_received')
+    GLOBAL_COUNTERS = ('reinits', 'reconnects')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        '''
+        Clear all counters and histograms
+        '''
+        with self._lock:
+            self._since = time.time()
+            self._commands = {}
+            self._totals = dict.fromkeys(self.COUNTERS + self.GLOBAL_COUNTERS, 0)
+
+    def count(self, counter, commandname=None, n=1, total=True):
+        '''
+        Increase counter
+
+        :param counter: name of counter as given in COUNTERS or GLOBAL_COUNTERS
+        :type counter: str
+        :param commandname: command to account for, None for totals only
+        :type commandname: str
+        :param n: increment
+        :type n: int
+        :param total: also increase total counter
+        :type total: bool
+        '''
+        with self._lock:
+            if total:
+                self._totals[counter] += n
+            if commandname:
+                self._command(commandname)['counters'][counter] += n
+
+    def observe(self, phase, commandname, seconds):
+        '''
+        Record duration of phase for command
+
+        :param phase: name of phase as given in PHASES
+        :type phase: str
+        :param commandname: command to account for
+        :type commandname: str
+        :param seconds: duration in seconds
+        :type seconds: float
+        '''
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._command(commandname or 'unknown')['phases'][phase]
+            stats['count'] += 1
+            stats['sum'] += ms
+            if ms > stats['max']:
+                stats['max'] = ms
+            stats['buckets'][bisect.bisect_left(self.BUCKETS, ms)] += 1
+
+    def get(self, name):
+        '''
+        Return single metric value
+
+        :param name: name of total counter or <commandname>.<counter>, <commandname>.bus_time, <commandname>.<phase>_avg or <commandname>.<phase>_max
+        :type name: str
+        :return: metric value or None if not available
+        '''
+        if name in self._totals:
+            return self._totals[name]
+
+        commandname, _, key = name.rpartition('.')
+        snapshot = self.snapshot()['commands'].get(commandname)
+        if snapshot is None:
+            return None
+        if key in snapshot['counters']:
+            return snapshot['counters'][key]
+        if key == 'bus_time':
+            return snapshot['bus_time']
+        phase, _, stat = key.rpartition('_')
+        if phase in snapshot['phases'] and stat in ('avg', 'max'):
+            return snapshot['phases'][phase][stat]
+        return None
+
+    def snapshot(self):
+        '''
+        Return copy of all metrics
+
+        :return: dict with keys 'since', 'totals' and 'commands'
+        :rtype: dict
+        '''
+        labels = [f'<={bound}' for bound in self.BUCKETS] + [f'>{self.BUCKETS[-1]}']
+        with self._lock:
+            commands = {}
+            for commandname, entry in self._commands.items():
+                phases = {}
+                for phase, stats in entry['phases'].items():
+                    phases[phase] = {
+                        'count': stats['count'],
+                        'avg': round(stats['sum'] / stats['count'], 3) if stats['count'] else 0,
+                        'max': round(stats['max'], 3),
+                        'buckets': dict(zip(labels, stats['buckets']))}
+                # time spent on the wire for this command
+                bus_time = entry['phases']['send']['sum'] + entry['phases']['receive']['sum']
+                commands[commandname] = {'counters': dict(entry['counters']), 'phases': phases, 'bus_time': round(bus_time, 3)}
+            return {'since': self._since, 'totals': dict(self._totals), 'commands': commands}
+
+    def _command(self, commandname):
+        # self._lock must be held by caller
+        if commandname not in self._commands:
+            self._commands[commandname] = {
+                'counters': dict.fromkeys(self.COUNTERS, 0),
+                'phases': {phase: {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * (len(self.BUCKETS) + 1)} for phase in self.PHASES}}
+        return self._commands[commandname]
+
+
+class ViessmannProfiler():
+    '''
+    Collects timing spans of wrapped methods.
+
+    Spans are appended to a buffer per thread without locking and only
+    aggregated when requested. Buffers of finished threads are dropped
+    after aggregating their spans.
+    '''
+    BUFFERSIZE = 10000
+
+    def __init__(self):
+        self._local = threading.local()
+        self._buffers = []                                                  # List of (thread, buffer)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, method, span):
+        '''
+        Return method wrapped to record its runtime
+
+        :param method: method to wrap
+        :param span: name of span
+        :type span: str
+        :return: wrapped method
+        '''
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            starttime = time.perf_counter_ns()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._buffer().append((span, time.perf_counter_ns() - starttime))
+        return wrapper
+
+    def aggregate(self, reset=False):
+        '''
+        Collect spans recorded since last call and return timing per span
+
+        :param reset: clear timings after returning them
+        :type reset: bool
+        :return: dict of span names with count, total, avg and max duration in ms
+        :rtype: dict
+        '''
+        with self._lock:
+            self._collect()
+
+            result = {}
+            for span, stats in self._stats.items():
+                result[span] = {
+                    'count': stats['count'],
+                    'total': round(stats['total'] / 1e6, 3),
+                    'avg': round(stats['total'] / stats['count'] / 1e6, 3),
+                    'max': round(stats['max'] / 1e6, 3)}
+            if reset:
+                self._stats = {}
+        return result
+
+    def _collect(self):
+        '''
+        Move recorded spans from all buffers into the statistics and drop
+        buffers of finished threads. self._lock must be held by the caller.
+        '''
+        for (thread, buffer) in self._buffers:
+            # popleft() and append() are thread-safe, so recording threads are not blocked
+            while True:
+                try:
+                    (span, duration) = buffer.popleft()
+                except IndexError:
+                    break
+                stats = self._stats.setdefault(span, {'count': 0, 'total': 0, 'max': 0})
+                stats['count'] += 1
+                stats['total'] += duration
+                if duration > stats['max']:
+                    stats['max'] = duration
+
+        # timer, daemon and webif threads are short-lived, don't keep their buffers
+        self._buffers = [(thread, buffer) for (thread, buffer) in self._buffers if thread.is_alive()]
+
+    def _buffer(self):
+        try:
+            return self._local.buffer
+        except AttributeError:
+            buffer = collections.deque(maxlen=self.BUFFERSIZE)
+            with self._lock:
+                # new threads are a good moment to get rid of buffers of finished threads
+                if any(not thread.is_alive() for (thread, old) in self._buffers):
+                    self._collect()
+                self._buffers.append((threading.current_thread(), buffer))
+            self._local.buffer = buffer
+            return buffer
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+import json
+import os
+import threading
+import time
+
+
+class AddressScanner():
+    '''
+    Sweeps an address range with block reads and records addresses which answered
+    with plausible data, i.e. not all bytes 0x00 or 0xff.
+
+    Progress is saved to a JSON file after each block, so an interrupted scan of
+    the same range can be resumed. The scan gives way to cyclic reads and pauses
+    between blocks to keep its share of bus time below the configured limit.
+    '''
+    # number of successful block reads after which a reduced block size is doubled again
+    GROW_AFTER = 8
+
+    def __init__(self, plugin, filename, start=0, end=0xffff, length=2, blocksize=16, bus_share=0.25):
+        self.plugin = plugin
+        self.logger = plugin.logger
+        self.filename = filename
+        self.length = length
+        # block reads need to cover whole datapoints
+        self.blocksize = self.max_blocksize = max(length, blocksize - blocksize % length)
+        self.bus_share = min(max(bus_share, 0.01), 1)
+        self.state = {'start': start, 'end': end, 'length': length, 'next': start, 'found': {}, 'failed': []}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()                                       # Protects self.state, which is changed by the scan thread
+        self._load()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        '''
+        Run scan in background thread
+        '''
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='viessmann_scanner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        '''
+        Stop scan and wait for current block to finish
+        '''
+        self._stop.set()
+        if self.running and threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def status(self):
+        '''
+        Return scan state
+
+        :return: copy of scan state with progress in percent, current block size and running flag
+        :rtype: dict
+        '''
+        with self._lock:
+            state = json.loads(json.dumps(self.state))
+        total = state['end'] - state['start'] + 1
+        state['progress'] = round((state['next'] - state['start']) / total * 100, 1)
+        state['blocksize'] = self.blocksize
+        state['running'] = self.running
+        return state
+
+    def run(self):
+        '''
+        Scan address range until done or stopped
+        '''
+        state = self.state
+        self.logger.info(f'Scanning addresses {state["next"]:04x} to {state["end"]:04x} with {self.blocksize} bytes per read')
+        clean = 0
+        while not self._stop.is_set() and state['next'] <= state['end'] and self.plugin.alive:
+
+            # give way to cyclic reads
+            while self.plugin._cyclic_update_active and not self._stop.wait(0.1):
+                pass
+
+            addr = state['next']
+            blocklength = min(self.blocksize, state['end'] + 1 - addr)
+            blocklength = max(self.length, blocklength - blocklength % self.length)
+
+            starttime = time.perf_counter()
+            (data, rejected) = self.plugin._read_block_checked(f'{addr:04x}', blocklength)
+            duration = time.perf_counter() - starttime
+
+            if data is None and blocklength > self.length:
+                # retry with smaller blocks; if the device rejected the block length, don't try it again
+                self.blocksize = max(self.length, blocklength // 2 - (blocklength // 2) % self.length)
+                if rejected:
+                    self.max_blocksize = self.blocksize
+                self.logger.debug(f'Block read at {addr:04x} failed, reducing block size to {self.blocksize} bytes')
+                clean = 0
+                continue
+
+            with self._lock:
+                if data is None:
+                    self._add_failed(addr, blocklength)
+                else:
+                    for offset in range(0, blocklength, self.length):
+                        value = data[offset:offset + self.length]
+                        if value.count(0x00) < len(value) and value.count(0xff) < len(value):
+                            state['found'][f'{addr + offset:04x}'] = value.hex()
+                            self.logger.info(f'Address scan found data {value.hex()} at {addr + offset:04x}')
+
+                state['next'] = addr + blocklength
+            self._save()
+
+            # a single glitch should not slow down the rest of the scan
+            clean = clean + 1 if data is not None else 0
+            if clean >= self.GROW_AFTER and self.blocksize < self.max_blocksize:
+                self.blocksize = min(self.max_blocksize, self.blocksize * 2)
+                self.logger.debug(f'{clean} block reads succeeded, increasing block size to {self.blocksize} bytes')
+                clean = 0
+
+            # pause to keep bus share
+            self._stop.wait(duration * (1 / self.bus_share - 1))
+
+        if state['next'] > state['end']:
+            self.logger.info(f'Address scan of {state["start"]:04x} to {state["end"]:04x} finished, found {len(state["found"])} addresses')
+        else:
+            self.logger.info(f'Address scan stopped at {state["next"]:04x}')
+
+    def _add_failed(self, addr, length):
+        failed = self.state['failed']
+        if failed and failed[-1][0] + failed[-1][1] == addr:
+            failed[-1][1] += length
+        else:
+            failed.append([addr, length])
+
+    def _load(self):
+        try:
+            with open(self.filename) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if all(state.get(key) == self.state[key] for key in ('start', 'end', 'length')):
+            self.logger.info(f'Resuming address scan at {state["next"]:04x}')
+            self.state = state
+
+    def _save(self):
+        with self._lock:
+            data = json.dumps(self.state)
+        try:
+            with open(self.filename + '.tmp', 'w') as f:
+                f.write(data)
+            os.replace(self.filename + '.tmp', self.filename)
+        except OSError as e:
+            self.logger.warning(f'Could not save address scan progress to {self.filename}: {e}')
@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+#########################################################################
+# Copyright 2020 Michael Wenzel
+# Copyright 2020 Sebastian Helms
+#########################################################################
+#  Viessmann-Plugin for SmartHomeNG.  https://github.com/smarthomeNG//
+#
+#  This plugin is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This plugin is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this plugin. If not, see <http://www.gnu.org/licenses/>.
+#########################################################################
+
+#  Standalone mode of the plugin, see __init__.py. Only imported if the plugin
+#  is run from the command line, not by SmartHomeNG.
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from datetime import datetime
+
+import commands
+from scanner import AddressScanner
+
+
+def get_device_type(v, protocol):
+
+    # try to connect and read device type info from 0x00f8
+    print(f'Trying protocol {protocol} on device {v._serialport}')
+
+    # first, initialize Viessmann object for use
+    v.alive = True
+    v._protocol = protocol
+
+    # setup protocol controlset
+    v._controlset = commands.controlset[protocol]
+    res = v._connect()
+    if not res:
+        v.logger.info(f'Connection to {v._serialport} failed. Please check connection.')
+        return None
+
+    res = v._init_communication()
+    if not res:
+        v.logger.info(f'Could not initialize communication using protocol {protocol}.')
+        return False
+
+    # we are connected to the IR head
+
+    # set needed unit
+    v._unitset = {
+        'DT': {'unit_de': 'DeviceType', 'type': 'list', 'signed': False, 'read_value_transform': 'non'}
+    }
+
+    # set needed command. DeviceType command is (hopefully) the same in all devices...
+    v._commandset = {
+        'DT': {'addr': '00f8', 'len': 2, 'unit': 'DT', 'set': False},
+    }
+
+    # we leave this empty so we get the DT code back
+    v._devicetypes = {}
+
+    # this is protocol dependent, so easier to let the Class work this out...
+    (packet, responselen) = v._build_command_packet('DT')
+    if packet is None:
+        raise ValueError('No command packet received for address 00f8. This shouldn\'t happen...')
+
+    # send it
+    response_packet = v._send_command_packet(packet, responselen)
+    if response_packet is None:
+        raise ValueError('Error on communicating with the device, no response received. Unknown error.')
+
+    # let it go...
+    v._disconnect()
+
+    res = v._parse_response(response_packet, 'DT')
+    if res is None:
+        raise ValueError('Invalid response received from the device.')
+
+    (val, code) = res
+    return val
+
+
+def probe_port(v):
+    '''
+    Try to identify the device on the serial port of the Viessmann instance,
+    using P300 first and KW second. Stops as soon as a protocol answers.
+
+    :param v: Viessmann instance created for standalone mode
+    :type v: Viessmann
+    :return: dict with port, protocol, device id and type, error message, duration and Viessmann instance
+    :rtype: dict
+    '''
+    result = {'port': v._serialport, 'protocol': None, 'id': None, 'type': None, 'error': '', 'duration': 0, 'plugin': v}
+
+    starttime = time.perf_counter()
+    for proto in ('P300', 'KW'):
+        try:
+            res = get_device_type(v, proto)
+        except Exception as e:
+            v._disconnect()
+            result['error'] = f'{proto}: {e}'
+            continue
+
+        if res is None:
+            # None means no connection, no further tries
+            result['error'] = 'Connection could not be established. Please check connection.'
+            break
+
+        if res is False:
+            # False means no comm init (only P300), go on
+            result['error'] = f'Communication could not be established using protocol {proto}.'
+        else:
+            # anything else should be the devices answer
+            result.update({'protocol': proto, 'id': res, 'type': commands.devicetypes.get(res, 'unknown'), 'error': ''})
+            break
+
+    result['duration'] = time.perf_counter() - starttime
+    return result
+
+
+def dump_device(v, blocksize=32, batchsize=20):
+    '''
+    Read all datapoints of the commandset loaded in the Viessmann instance.
+
+    On P300, adjacent datapoints are read in blocks of up to blocksize bytes;
+    on KW, datapoints are read in batches of batchsize commands with one sync each.
+    Failed blocks or batches are retried per datapoint. On KW, commands sharing
+    their address with another command are only read once.
+
+    :param v: connected Viessmann instance with loaded configuration
+    :type v: Viessmann
+    :param blocksize: maximum number of bytes per block read (P300)
+    :type blocksize: int
+    :param batchsize: maximum number of commands per batch (KW)
+    :type batchsize: int
+    :return: dict with device info, values and per-read timings
+    :rtype: dict
+    '''
+    dump = {'time': datetime.now().isoformat(), 'port': v._serialport, 'protocol': v._protocol, 'type': v._heating_type, 'values': {}, 'reads': [], 'errors': []}
+
+    # sort commands by address, so adjacent datapoints can be read together
+    commands_by_addr = sorted(v._commandset, key=lambda command: (int(v._commandset[command]['addr'], 16), v._commandset[command]['len']))
+
+    def add_read(commandnames, addr, length, starttime, ok):
+        duration = time.perf_counter() - starttime
+        dump['reads'].append({'addr': addr, 'len': length, 'commands': commandnames, 'duration': duration, 'ok': ok})
+        return duration
+
+    def add_value(commandname, value, duration):
+        commandconf = v._commandset[commandname]
+        dump['values'][commandname] = {'addr': commandconf['addr'].lower(), 'len': commandconf['len'], 'unit': commandconf['unit'], 'value': value, 'time': datetime.now().isoformat(), 'duration': duration}
+
+    def decode(commandname, rawdatabytes, duration):
+        try:
+            value = v._decode_value(rawdatabytes, commandname)
+        except Exception as e:
+            v.logger.debug(f'Could not decode value for {commandname}: {e}')
+            value = None
+        if value is None:
+            dump['errors'].append(commandname)
+        else:
+            add_value(commandname, value, duration)
+
+    starttime = time.perf_counter()
+
+    if v._protocol == 'P300':
+        # group adjacent datapoints into blocks
+        blocks = []
+        for commandname in commands_by_addr:
+            addr = int(v._commandset[commandname]['addr'], 16)
+            end = addr + v._commandset[commandname]['len']
+            if blocks and end - blocks[-1]['start'] <= blocksize and addr <= blocks[-1]['end']:
+                blocks[-1]['end'] = max(end, blocks[-1]['end'])
+                blocks[-1]['commands'].append(commandname)
+            else:
+                blocks.append({'start': addr, 'end': end, 'commands': [commandname]})
+
+        for block in blocks:
+            if not v.alive:
+                break
+            length = block['end'] - block['start']
+            readtime = time.perf_counter()
+            rawdatabytes = v._read_block(f'{block["start"]:04x}', length)
+            duration = add_read(block['commands'], f'{block["start"]:04x}', length, readtime, rawdatabytes is not None)
+            if rawdatabytes is not None:
+                for commandname in block['commands']:
+                    offset = int(v._commandset[commandname]['addr'], 16) - block['start']
+                    decode(commandname, rawdatabytes[offset:offset + v._commandset[commandname]['len']], duration)
+                continue
+
+            # fall back to single reads
+            for commandname in block['commands']:
+                commandconf = v._commandset[commandname]
+                if len(block['commands']) == 1:
+                    rawdatabytes = None
+                else:
+                    readtime = time.perf_counter()
+                    rawdatabytes = v._read_block(commandconf['addr'].lower(), commandconf['len'])
+                    duration = add_read([commandname], commandconf['addr'].lower(), commandconf['len'], readtime, rawdatabytes is not None)
+                if rawdatabytes is None:
+                    dump['errors'].append(commandname)
+                else:
+                    decode(commandname, rawdatabytes, duration)
+
+    elif v._protocol == 'KW':
+        # one read per address, values are returned via _last_values
+        addrs = []
+        for commandname in commands_by_addr:
+            addr = v._commandset[commandname]['addr'].lower()
+            if v._commandname_by_commandcode(addr) == commandname:
+                addrs.append(addr)
+
+        def read_batch(batch):
+            readtime = time.time()
+            starttime = time.perf_counter()
+            v._KW_send_multiple_read_commands(batch, update_items=False, fault_log=False)
+            read = [addr for addr in batch if v._last_values_time.get(addr, 0) >= readtime]
+            commandnames = [v._commandname_by_commandcode(addr) for addr in batch]
+            duration = add_read(commandnames, batch[0], sum(v._commandset[commandname]['len'] for commandname in commandnames), starttime, len(read) == len(batch))
+            return (read, duration)
+
+        for index in range(0, len(addrs), batchsize):
+            if not v.alive:
+                break
+            batch = addrs[index:index + batchsize]
+            (read, duration) = read_batch(batch)
+            if len(read) < len(batch) and len(batch) > 1:
+                # on error, the whole batch is discarded. Retry per address
+                for addr in batch:
+                    (read, duration) = read_batch([addr])
+                    if read:
+                        add_value(v._commandname_by_commandcode(addr), v._last_values[addr], duration)
+                    else:
+                        dump['errors'].append(v._commandname_by_commandcode(addr))
+                continue
+            for addr in batch:
+                add_value(v._commandname_by_commandcode(addr), v._last_values[addr], duration)
+
+    dump['duration'] = time.perf_counter() - starttime
+    dump['rate'] = len(dump['values']) / dump['duration'] if dump['duration'] else 0
+    return dump
+
+
+def write_dump(dump, filename, fmt='json'):
+    '''
+    Write result of dump_device to file
+
+    :param dump: result of dump_device
+    :type dump: dict
+    :param filename: name of output file
+    :type filename: str
+    :param fmt: output format, 'json' or 'csv'
+    :type fmt: str
+    '''
+    if fmt == 'csv':
+        with open(filename, 'w', newline='') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(['command', 'addr', 'len', 'unit', 'value', 'time', 'read_ms'])
+            for commandname, entry in dump['values'].items():
+                value = json.dumps(entry['value']) if isinstance(entry['value'], (list, dict)) else entry['value']
+                writer.writerow([commandname, entry['addr'], entry['len'], entry['unit'], value, entry['time'], f'{entry["duration"] * 1000:.1f}'])
+    else:
+        with open(filename, 'w') as f:
+            json.dump(dump, f, indent=2, default=str)
+
+
+class ViessmannDaemon():
+    '''
+    Serves read and write requests of local clients over a UNIX or TCP socket,
+    so several programs can share one serial connection.
+
+    Requests and responses are JSON objects, one per line. Concurrent reads of
+    the same address are combined into one device read, recently read values
+    are answered from the value cache of the Viessmann instance.
+
+    Requests (``addr`` can be replaced by ``name`` with the command name):
+
+    - ``{"cmd": "read", "addr": "0800", "maxage": 10, "force": false, "timeout": 5}``
+    - ``{"cmd": "read_bulk", "addrs": ["0800", "0802"]}``
+    - ``{"cmd": "read_temp", "addr": "0800", "len": 2, "unit": "IS10"}``
+    - ``{"cmd": "write", "addr": "2323", "value": 1}``
+    - ``{"cmd": "write_bulk", "values": {"27d3": 14, "27d4": 2}}``
+    - ``{"cmd": "commands"}``, ``{"cmd": "status"}``
+
+    All requests accessing the device accept ``timeout`` in seconds to limit the
+    time spent waiting for the device. Responses contain ``ok`` and ``value``,
+    ``values`` or ``error``; an ``id`` given in the request is returned unchanged.
+    '''
+
+    def __init__(self, plugin, address, maxage=1):
+        self.plugin = plugin
+        self.logger = plugin.logger
+        self.address = address
+        self.stats = {'clients': 0, 'requests': 0, 'errors': 0, 'coalesced': 0}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._server = None
+        plugin._default_maxage = maxage
+
+    def serve_forever(self):
+        '''
+        Open socket and serve clients until shutdown() is called
+        '''
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+
+            def handle(self):
+                daemon._count('clients')
+                for line in self.rfile:
+                    if line.strip():
+                        response = daemon.handle_request(line)
+                        self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+
+        if self.address.startswith('unix:'):
+            path = self.address[5:]
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = socketserver.ThreadingUnixStreamServer(path, RequestHandler)
+        else:
+            (host, _, port) = self.address.rpartition(':')
+            self._server = socketserver.ThreadingTCPServer((host or 'localhost', int(port)), RequestHandler)
+        self._server.daemon_threads = True
+
+        self.logger.info(f'Serving requests on {self.address}')
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.address.startswith('unix:'):
+                try:
+                    os.unlink(self.address[5:])
+                except OSError:
+                    pass
+
+    def shutdown(self):
+        '''
+        Stop serving clients
+        '''
+        if self._server:
+            self._server.shutdown()
+
+    def handle_request(self, line):
+        '''
+        Process one request line
+
+        :param line: JSON encoded request
+        :type line: bytes
+        :return: response
+        :rtype: dict
+        '''
+        self._count('requests')
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('request is not a JSON object')
+        except ValueError as e:
+            self._count('errors')
+            return {'ok': False, 'error': f'invalid request: {e}'}
+
+        response = {'ok': True}
+        if 'id' in request:
+            response['id'] = request['id']
+
+        try:
+            cmd = request.get('cmd')
+            timeout = request.get('timeout')
+            if timeout is not None:
+                timeout = float(timeout)
+            if cmd == 'read':
+                response['value'] = self.read(self._get_addr(request), request.get('force', False), request.get('maxage'), timeout)
+                response['ok'] = response['value'] is not None
+            elif cmd == 'read_bulk':
+                addrs = request.get('addrs') or [self.plugin._commandset[name]['addr'] for name in request.get('names', [])]
+                response['values'] = self.read_bulk(addrs, request.get('force', False), request.get('maxage'), timeout)
+                response['ok'] = None not in response['values'].values()
+            elif cmd == 'read_temp':
+                response['value'] = self.plugin.read_temp_addr(self._get_addr(request), int(request['len']), request['unit'], timeout)
+                response['ok'] = response['value'] is not None
+            elif cmd == 'write':
+                response['ok'] = self.plugin.write_addr(self._get_addr(request), request['value'], timeout) is True
+            elif cmd == 'write_bulk':
+                with self.plugin._request_deadline(timeout):
+                    response['values'] = self.plugin.write_addrs(request['values'])
+                response['ok'] = all(response['values'].values())
+            elif cmd == 'commands':
+                response['value'] = self.plugin._commandset
+            elif cmd == 'status':
+                with self._lock:
+                    stats = dict(self.stats)
+                with self.plugin._value_lock:
+                    cache = dict(self.plugin._cache_stats)
+                response['value'] = {'daemon': stats, 'cache': cache, 'metrics': self.plugin.get_metrics()}
+            else:
+                raise ValueError(f'unknown command {cmd}')
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            response['ok'] = False
+            response['error'] = f'invalid request: {e}'
+        except Exception as e:
+            # never drop the client connection because of a single request
+            self.logger.error(f'Daemon request {request} failed: {e}')
+            response['ok'] = False
+            response['error'] = f'request failed: {e}'
+
+        if not response['ok']:
+            self._count('errors')
+            response.setdefault('error', 'request failed')
+        return response
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def read(self, addr, force=False, maxage=None, timeout=None):
+        '''
+        Read data point. If a read of the same address is already running,
+        wait for it and return its result.
+
+        :param addr: data point addr (2 byte hex address)
+        :type addr: str
+        :param force: always read from device, ignoring cached values
+        :type force: bool
+        :param maxage: maximum age of cached value in seconds
+        :type maxage: float
+        :param timeout: maximum time to wait for the value in seconds
+        :type timeout: float
+        :return: Value if read is successful, None otherwise
+        '''
+        addr = addr.lower()
+        with self._lock:
+            future = self._inflight.get(addr)
+            owner = future is None
+            if owner:
+                future = self._inflight[addr] = Future()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                return None
+
+        try:
+            value = self.plugin.read_addr(addr, force, maxage, timeout)
+            future.set_result(value)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[addr]
+        return value
+
+    def read_bulk(self, addrs, force=False, maxage=None, timeout=None):
+        '''
+        Read multiple data points. With KW protocol, all data points without
+        recent values are read after one sync.
+
+        :param addrs: list of data point addrs (2 byte hex address)
+        :type addrs: list
+        :param force: always read from device, ignoring cached values
+        :type force: bool
+        :param maxage: maximum age of cached values in seconds
+        :type maxage: float
+        :param timeout: maximum time to wait for the values in seconds
+        :type timeout: float
+        :return: dict of addr and value, None for failed reads
+        :rtype: dict
+        '''
+        addrs = [addr.lower() for addr in addrs]
+        plugin = self.plugin
+        if plugin._protocol == 'KW':
+            readtime = time.time()
+            todo = []
+            for addr in addrs:
+                if plugin._commandname_by_commandcode(addr) is None or addr in todo:
+                    continue
+                age = maxage if maxage is not None else plugin._get_maxage(addr)
+                if force or age <= 0 or readtime - plugin._last_values_time.get(addr, 0) > age:
+                    todo.append(addr)
+            if todo:
+                with plugin._request_deadline(timeout):
+                    plugin._KW_send_multiple_read_commands(todo, update_items=False, fault_log=False)
+            return {addr: plugin._last_values.get(addr) if addr not in todo or plugin._last_values_time.get(addr, 0) >= readtime else None for addr in addrs}
+
+        # one deadline for all reads
+        with plugin._request_deadline(timeout):
+            return {addr: self.read(addr, force, maxage) for addr in addrs}
+
+    def _get_addr(self, request):
+        if 'name' in request:
+            return self.plugin._commandset[request['name']]['addr']
+        return request['addr']
+
+
+def main(plugin):
+    '''
+    Identify devices on the serial ports given on the command line and optionally
+    scan, dump or serve the first identified device
+
+    :param plugin: plugin class to create instances of
+    :type plugin: class
+    '''
+
+    usage = '''
+    This plugin is meant to be used inside SmartHomeNG.
+
+    For diagnostic purposes, you can run it as a standalone Python program from the
+    command line. It will try to communicate with a connected Viessmann heating system
+    and return the device type and the necessary protocol for setting up your plugin
+    in SmartHomeNG.
+
+    You need to call this plugin with the serial interface as the first parameter, e.g.
+
+    ./__init__.py /dev/ttyUSB0
+
+    Multiple interfaces or patterns can be given and are probed in parallel:
+
+    ./__init__.py /dev/ttyUSB0 /dev/ttyUSB1
+    ./__init__.py '/dev/ttyUSB*'
+
+    If you call it with -v, you get additional debug information:
+
+    ./__init__.py /dev/ttyUSB0 -v
+
+    To play back a capture file instead of using the serial interface, use
+
+    ./__init__.py replay:<capture file>
+
+    To scan an address range for undocumented datapoints after identifying the device, use
+
+    ./__init__.py /dev/ttyUSB0 --scan 0000-ffff
+
+    An interrupted scan of the same range is resumed from the state file.
+
+    To read all datapoints of the identified device and save them as JSON or CSV, use
+
+    ./__init__.py /dev/ttyUSB0 --dump values.json
+    ./__init__.py /dev/ttyUSB0 --dump values.csv
+
+    To share the serial interface with other programs, run as daemon serving JSON requests
+    on a UNIX or TCP socket, e.g.
+
+    ./__init__.py /dev/ttyUSB0 --daemon unix:/tmp/viessmann.sock
+    ./__init__.py /dev/ttyUSB0 --daemon localhost:3002
+    '''
+
+    parser = argparse.ArgumentParser(description=usage, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('serialport', nargs='+', help='serial interface(s) or glob pattern, e.g. /dev/ttyUSB0, or replay:<capture file>')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show debug information')
+    parser.add_argument('-c', '--capture', metavar='FILE', default='', help='record communication to capture file (with port name appended if multiple ports are given)')
+    parser.add_argument('--scan', metavar='START-END', help='scan address range (four-digit hex addresses) on the first identified device')
+    parser.add_argument('--length', type=int, default=2, help='bytes per datapoint for scan (default: 2)')
+    parser.add_argument('--blocksize', type=int, default=16, help='bytes per read for scan (default: 16)')
+    parser.add_argument('--state', metavar='FILE', default='viessmann_scan.json', help='file to save scan progress to (default: viessmann_scan.json)')
+    parser.add_argument('--dump', metavar='FILE', help='read all datapoints of the first identified device and save them to FILE')
+    parser.add_argument('--format', choices=('json', 'csv'), help='format of dump file (default: from file extension, else json)')
+    parser.add_argument('--daemon', metavar='ADDRESS', help='serve requests for the first identified device on unix:<path> or [host:]port')
+    parser.add_argument('--maxage', type=float, default=1, help='maximum age of cached values for daemon requests in seconds (default: 1)')
+    args = parser.parse_args()
+
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.CRITICAL)
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.DEBUG)
+
+    # create formatter and add it to the handlers
+    formatter = logging.Formatter('%(asctime)s - %(threadName)s - %(message)s  @ %(lineno)d')
+    ch.setFormatter(formatter)
+
+    # add the handlers to the logger
+    logger.addHandler(ch)
+
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+
+    # expand patterns, keep order and skip duplicates
+    serialports = []
+    for pattern in args.serialport:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f'No serial interfaces found for {pattern}')
+        for serialport in matches:
+            if serialport not in serialports:
+                serialports.append(serialport)
+
+    if not serialports:
+        exit(1)
+
+    print("This is Viessmann plugin running in standalone mode")
+    print("===================================================")
+
+    starttime = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=len(serialports)) as executor:
+        futures = []
+        for serialport in serialports:
+            capture = args.capture
+            if capture and len(serialports) > 1:
+                capture = f'{capture}.{os.path.basename(serialport)}'
+            v = plugin(None, standalone=serialport, logger=logger)
+            v._capture_file = capture
+            futures.append(executor.submit(probe_port, v))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['protocol']:
+                print(f'{result["port"]}: device ID is {result["id"]}, device type is {result["type"]} using protocol {result["protocol"]}')
+            else:
+                print(f'{result["port"]}: {result["error"]}')
+
+    print()
+    print(f'Probed {len(serialports)} interface(s) in {time.perf_counter() - starttime:.1f} seconds:')
+    results.sort(key=lambda result: serialports.index(result['port']))
+    for result in results:
+        found = f'{result["type"]} ({result["id"]}), {result["protocol"]}' if result['protocol'] else 'not identified'
+        print(f'  {result["port"]:<24} {found:<32} {result["duration"]:6.1f} s')
+
+    identified = [result for result in results if result['protocol']]
+    if args.scan and not identified:
+        print('Device not identified, not scanning.')
+    elif args.scan:
+        result = identified[0]
+        v = result['plugin']
+        (start, _, end) = args.scan.partition('-')
+        v._protocol = result['protocol']
+        v._controlset = commands.controlset[result['protocol']]
+        v.alive = True
+        if v._init_communication():
+            scanner = AddressScanner(v, args.state, int(start, 16), int(end or start, 16), args.length, args.blocksize, 1)
+            print(f'Scanning addresses {scanner.state["next"]:04x} to {scanner.state["end"]:04x} on {result["port"]} using protocol {result["protocol"]}')
+            try:
+                scanner.run()
+            except KeyboardInterrupt:
+                print(f'Scan interrupted, progress saved to {args.state}')
+            v._disconnect()
+            for addr, value in scanner.state['found'].items():
+                print(f'{addr}: {value}')
+        else:
+            print(f'Communication could not be established using protocol {result["protocol"]}.')
+
+    if (args.dump or args.daemon) and not identified:
+        print('Device not identified, not reading datapoints.')
+    elif args.dump or args.daemon:
+        result = identified[0]
+        v = result['plugin']
+        v._protocol = result['protocol']
+        v._heating_type = result['type']
+        v.alive = True
+        ready = False
+        if not v._load_configuration():
+            print(f'No command configuration found for device type {result["type"]}.')
+        elif not v._connect() or not v._init_communication():
+            print(f'Communication could not be established using protocol {result["protocol"]}.')
+        else:
+            ready = True
+
+        if ready and args.dump:
+            print(f'Reading {len(v._commandset)} datapoints from {result["port"]} using protocol {result["protocol"]}')
+            try:
+                dump = dump_device(v)
+            except KeyboardInterrupt:
+                dump = None
+                print('Reading interrupted.')
+            if dump:
+                fmt = args.format or ('csv' if args.dump.lower().endswith('.csv') else 'json')
+                write_dump(dump, args.dump, fmt)
+                durations = [read['duration'] for read in dump['reads']]
+                print(f'Read {len(dump["values"])} datapoints in {len(dump["reads"])} requests in {dump["duration"]:.1f} seconds ({dump["rate"]:.1f} datapoints/s), {len(dump["errors"])} errors')
+                if durations:
+                    print(f'Time per request: min {min(durations) * 1000:.0f} ms, avg {sum(durations) / len(durations) * 1000:.0f} ms, max {max(durations) * 1000:.0f} ms')
+                print(f'Saved datapoints to {args.dump} as {fmt}')
+
+        if ready and args.daemon:
+            daemon = ViessmannDaemon(v, args.daemon, args.maxage)
+            print(f'Serving requests for {result["type"]} on {result["port"]} at {args.daemon}, press Ctrl-C to stop')
+            try:
+                daemon.serve_forever()
+            except KeyboardInterrupt:
+                print('Daemon stopped.')
+
+        v.alive = False
+        v._stop_event.set()
+        v._disconnect()
+
+    print('Done.')
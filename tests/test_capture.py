@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import collections
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture import CaptureSerial, ReplaySerial, read_capture, CAPTURE_TX, CAPTURE_RX  # noqa: E402
+
+
+class LoopbackPort():
+    '''
+    Answers each written telegram with the next prepared reply
+    '''
+
+    def __init__(self, replies):
+        self.replies = collections.deque(replies)
+        self.pending = bytearray()
+        self.baudrate = 4800
+
+    def write(self, data):
+        if self.replies:
+            self.pending.extend(self.replies.popleft())
+        return len(data)
+
+    def read(self, size=1):
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
+
+    def close(self):
+        pass
+
+
+class TestCapture(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self._dir.name, 'capture.bin')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def record(self):
+        port = CaptureSerial(LoopbackPort([b'\x06', b'\x06\x41\x07']), self.filename)
+        self.assertEqual(port.baudrate, 4800)
+        port.write(b'\x16\x00\x00')
+        self.assertEqual(port.read(1), b'\x06')
+        # timeouts are not recorded
+        self.assertEqual(port.read(1), b'')
+        port.write(b'\x41\x05\x00\x01\x08\x00\x02\x10')
+        self.assertEqual(port.read(3), b'\x06\x41\x07')
+        port.close()
+
+    def test_read_capture(self):
+        self.record()
+        records = list(read_capture(self.filename))
+        self.assertEqual([(direction, data) for (timestamp, direction, data) in records],
+                         [(CAPTURE_TX, b'\x16\x00\x00'), (CAPTURE_RX, b'\x06'), (CAPTURE_TX, b'\x41\x05\x00\x01\x08\x00\x02\x10'), (CAPTURE_RX, b'\x06\x41\x07')])
+        timestamps = [timestamp for (timestamp, direction, data) in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_truncated_capture(self):
+        self.record()
+        with open(self.filename, 'ab') as f:
+            f.write(b'\x00\x01')
+        self.assertEqual(len(list(read_capture(self.filename))), 4)
+
+    def test_replay(self):
+        self.record()
+        port = ReplaySerial(self.filename)
+        port.open()
+        self.assertTrue(port.is_open)
+        # nothing to receive before the captured telegram was sent
+        self.assertEqual(port.read(1), b'')
+        port.write(b'\x16\x00\x00')
+        self.assertEqual(port.read(1), b'\x06')
+        self.assertEqual(port.read(1), b'')
+        # sent data differing from the capture is only logged
+        port.write(b'\x41\x05\x00\x01\x08\x00\x02\x11')
+        self.assertEqual(port.read(3), b'\x06\x41\x07')
+        port.close()
+        self.assertFalse(port.is_open)
+
+    def test_not_a_capture_file(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'something else')
+        with self.assertRaises(ValueError):
+            list(read_capture(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryRing, CounterRate, HistoryFile, read_history, HISTORY_HEADER, HISTORY_RECORD  # noqa: E402
+
+
+class TestHistoryRing(unittest.TestCase):
+
+    def test_append_and_wrap(self):
+        ring = HistoryRing(4)
+        for index in range(6):
+            ring.append(100 + index, index)
+        self.assertEqual(len(ring), 4)
+        (times, values) = ring.window()
+        self.assertEqual(list(times), [102, 103, 104, 105])
+        self.assertEqual(list(values), [2, 3, 4, 5])
+
+    def test_window(self):
+        ring = HistoryRing(4)
+        for index in range(6):
+            ring.append(100 + index, index)
+        # window wraps around the end of the buffer
+        (times, values) = ring.window(103, 104)
+        self.assertEqual(list(times), [103, 104])
+        self.assertEqual(list(values), [3, 4])
+        self.assertEqual(list(ring.window(106)[1]), [])
+        self.assertEqual(list(ring.window(None, 102)[1]), [2])
+
+    def test_stats(self):
+        ring = HistoryRing(10)
+        self.assertEqual(ring.stats()['count'], 0)
+        for index, value in enumerate((3, 1, 2)):
+            ring.append(index, value)
+        stats = ring.stats()
+        self.assertEqual(stats['count'], 3)
+        self.assertEqual(stats['min'], 1)
+        self.assertEqual(stats['max'], 3)
+        self.assertEqual(stats['mean'], 2)
+        self.assertEqual(stats['first'], 0)
+        self.assertEqual(stats['last'], 2)
+
+    def test_downsample(self):
+        ring = HistoryRing(100)
+        for index in range(100):
+            ring.append(index, index)
+        (times, values) = ring.downsample(10)
+        self.assertEqual(len(values), 10)
+        self.assertAlmostEqual(values[0], 4.5)
+        self.assertAlmostEqual(times[-1], 94.5)
+        # less values than points are returned unchanged
+        (times, values) = ring.downsample(10, 95)
+        self.assertEqual(values, [95, 96, 97, 98, 99])
+
+
+class TestCounterRate(unittest.TestCase):
+
+    def test_rate(self):
+        rate = CounterRate(window=3600)
+        self.assertIsNone(rate.update(0, 100))
+        self.assertEqual(rate.update(10, 110), 1)
+        self.assertEqual(rate.update(20, 130), 1.5)
+
+    def test_window(self):
+        rate = CounterRate(window=10)
+        rate.update(0, 0)
+        rate.update(10, 100)
+        # the last sample before the window is kept as base
+        self.assertEqual(rate.update(30, 120), 1)
+
+    def test_wraparound(self):
+        rate = CounterRate(modulo=65536)
+        rate.update(0, 65530)
+        self.assertEqual(rate.update(10, 10), 1.6)
+
+    def test_reset(self):
+        rate = CounterRate(modulo=65536)
+        rate.update(0, 1000)
+        rate.update(10, 1010)
+        # small decrease means counter reset, the window restarts
+        self.assertIsNone(rate.update(20, 5))
+        self.assertEqual(rate.update(30, 15), 1)
+
+
+class TestHistoryFile(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self._dir.name, 'history.bin')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_read_range(self):
+        history = HistoryFile(self.filename)
+        for index in range(10):
+            history.append(100 + index, 0x0800 + index % 2, index)
+        history.close()
+        self.assertEqual(len(list(read_history(self.filename))), 10)
+        self.assertEqual([record[2] for record in read_history(self.filename, 103, 106)], [3, 4, 5, 6])
+        self.assertEqual([record[2] for record in read_history(self.filename, addr=0x0801)], [1, 3, 5, 7, 9])
+
+    def test_rotation(self):
+        # header and three records fit into one file
+        history = HistoryFile(self.filename, len(HISTORY_HEADER) + 3 * HISTORY_RECORD.size, 3)
+        for index in range(10):
+            history.append(index, 0x0800, index)
+        history.close()
+        self.assertTrue(os.path.exists(f'{self.filename}.2'))
+        self.assertFalse(os.path.exists(f'{self.filename}.3'))
+        # oldest file was dropped, records are returned in chronological order
+        self.assertEqual([record[2] for record in read_history(self.filename)], [3, 4, 5, 6, 7, 8, 9])
+        self.assertEqual([record[2] for record in read_history(self.filename, 5)], [5, 6, 7, 8, 9])
+
+    def test_single_file(self):
+        history = HistoryFile(self.filename, len(HISTORY_HEADER) + 3 * HISTORY_RECORD.size, 1)
+        for index in range(4):
+            history.append(index, 0x0800, index)
+        history.close()
+        self.assertEqual([record[2] for record in read_history(self.filename)], [3])
+
+    def test_incomplete_record(self):
+        history = HistoryFile(self.filename)
+        history.append(1, 0x0800, 1)
+        history.close()
+        with open(self.filename, 'ab') as f:
+            f.write(b'\x00' * 5)
+        history.append(2, 0x0800, 2)
+        history.close()
+        self.assertEqual(list(read_history(self.filename)), [(1, 0x0800, 1), (2, 0x0800, 2)])
+
+    def test_not_a_history_file(self):
+        with open(self.filename, 'wb') as f:
+            f.write(b'something else')
+        with self.assertRaises(ValueError):
+            list(read_history(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from locking import FairLock  # noqa: E402
+
+
+class TestFairLock(unittest.TestCase):
+
+    def test_reentrant(self):
+        lock = FairLock()
+        self.assertTrue(lock.acquire())
+        self.assertTrue(lock.acquire())
+        lock.release()
+        self.assertTrue(lock.locked())
+        lock.release()
+        self.assertFalse(lock.locked())
+
+    def test_release_by_other_thread(self):
+        lock = FairLock()
+        lock.acquire()
+        errors = []
+
+        def release():
+            try:
+                lock.release()
+            except RuntimeError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=release)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        lock.release()
+
+    def test_timeout(self):
+        lock = FairLock()
+        lock.acquire()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(lock.acquire(timeout=0.05)))
+        thread.start()
+        thread.join()
+        self.assertEqual(result, [False])
+        self.assertEqual(lock.waiting(), 0)
+        lock.release()
+
+    def test_abort(self):
+        lock = FairLock()
+        lock.acquire()
+        abort = threading.Event()
+        result = []
+        thread = threading.Thread(target=lambda: result.append(lock.acquire(abort=abort.is_set)))
+        thread.start()
+        while not lock.waiting():
+            time.sleep(0.01)
+        abort.set()
+        lock.interrupt()
+        thread.join(1)
+        self.assertEqual(result, [False])
+        lock.release()
+
+    def test_fifo_order(self):
+        lock = FairLock()
+        lock.acquire()
+        order = []
+
+        def worker(index):
+            with lock:
+                order.append(index)
+
+        threads = []
+        for index in range(5):
+            thread = threading.Thread(target=worker, args=(index,))
+            thread.start()
+            threads.append(thread)
+            # make sure the threads queue up in order
+            while lock.waiting() < index + 1:
+                time.sleep(0.01)
+        lock.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order, [0, 1, 2, 3, 4])
+
+
+if __name__ == '__main__':
+    unittest.main()
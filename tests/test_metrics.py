@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import ViessmannMetrics, ViessmannProfiler  # noqa: E402
+
+
+class TestViessmannMetrics(unittest.TestCase):
+
+    def test_counters(self):
+        metrics = ViessmannMetrics()
+        metrics.count('requests', 'Aussentemperatur')
+        metrics.count('requests', 'Aussentemperatur')
+        metrics.count('bytes_sent', 'Aussentemperatur', 8, False)
+        metrics.count('reconnects')
+        self.assertEqual(metrics.get('requests'), 2)
+        self.assertEqual(metrics.get('bytes_sent'), 0)
+        self.assertEqual(metrics.get('reconnects'), 1)
+        self.assertEqual(metrics.get('Aussentemperatur.requests'), 2)
+        self.assertEqual(metrics.get('Aussentemperatur.bytes_sent'), 8)
+        self.assertIsNone(metrics.get('Kesseltemperatur.requests'))
+
+    def test_histogram(self):
+        metrics = ViessmannMetrics()
+        metrics.observe('receive', 'Aussentemperatur', 0.004)
+        metrics.observe('receive', 'Aussentemperatur', 0.006)
+        metrics.observe('receive', 'Aussentemperatur', 10)
+        phase = metrics.snapshot()['commands']['Aussentemperatur']['phases']['receive']
+        self.assertEqual(phase['count'], 3)
+        self.assertEqual(phase['max'], 10000)
+        self.assertEqual(phase['buckets']['<=5'], 1)
+        self.assertEqual(phase['buckets']['<=10'], 1)
+        self.assertEqual(phase['buckets']['>5000'], 1)
+        self.assertEqual(metrics.get('Aussentemperatur.receive_max'), 10000)
+
+    def test_snapshot_is_copy(self):
+        metrics = ViessmannMetrics()
+        metrics.count('requests', 'Aussentemperatur')
+        snapshot = metrics.snapshot()
+        snapshot['totals']['requests'] = 100
+        snapshot['commands']['Aussentemperatur']['counters']['requests'] = 100
+        self.assertEqual(metrics.get('requests'), 1)
+        self.assertEqual(metrics.get('Aussentemperatur.requests'), 1)
+
+    def test_reset(self):
+        metrics = ViessmannMetrics()
+        metrics.count('errors', 'Aussentemperatur')
+        metrics.reset()
+        self.assertEqual(metrics.get('errors'), 0)
+        self.assertEqual(metrics.snapshot()['commands'], {})
+
+
+class TestViessmannProfiler(unittest.TestCase):
+
+    def test_aggregate(self):
+        profiler = ViessmannProfiler()
+        wrapped = profiler.wrap(lambda value: value * 2, 'double')
+        self.assertEqual(wrapped(2), 4)
+        self.assertEqual(wrapped(3), 6)
+        stats = profiler.aggregate(reset=True)
+        self.assertEqual(stats['double']['count'], 2)
+        self.assertEqual(profiler.aggregate(), {})
+
+    def test_finished_threads(self):
+        profiler = ViessmannProfiler()
+        wrapped = profiler.wrap(lambda: None, 'span')
+        for index in range(10):
+            thread = threading.Thread(target=wrapped)
+            thread.start()
+            thread.join()
+        # spans of finished threads are kept, their buffers are not
+        self.assertEqual(profiler.aggregate()['span']['count'], 10)
+        self.assertEqual(profiler._buffers, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import importlib
+import logging
+import os
+import sys
+import unittest
+from datetime import datetime
+
+# the plugin class needs SmartHomeNG, so import it as plugins.<plugin dir> from the SmartHomeNG base directory
+PLUGIN_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(PLUGIN_DIR)))
+
+try:
+    Viessmann = importlib.import_module(f'plugins.{os.path.basename(PLUGIN_DIR)}').Viessmann
+except ImportError:
+    Viessmann = None
+
+
+def create_plugin(protocol='P300', heating_type='V200KO1B'):
+    v = Viessmann(None, standalone='/dev/null', logger=logging.getLogger(__name__))
+    v._protocol = protocol
+    v._heating_type = heating_type
+    v._load_configuration()
+    return v
+
+
+@unittest.skipIf(Viessmann is None, 'SmartHomeNG not found')
+class TestDecode(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = create_plugin()
+
+    def test_datetime(self):
+        self.assertEqual(self.plugin._decode_datetime(bytes.fromhex('2024011501102030')), datetime(2024, 1, 15, 10, 20, 30))
+        self.assertEqual(self.plugin._decode_datetime(memoryview(bytes.fromhex('ff2024011501102030'))[1:]), datetime(2024, 1, 15, 10, 20, 30))
+
+    def test_datetime_weekday_ignored(self):
+        self.assertEqual(self.plugin._decode_datetime(bytes.fromhex('2024011509102030')), datetime(2024, 1, 15, 10, 20, 30))
+
+    def test_datetime_invalid(self):
+        for raw in ('20240115011020', '20240115011a2030', '2024131501102030', '0000000000000000', 'ffffffffffffffff'):
+            with self.assertRaises(ValueError, msg=raw):
+                self.plugin._decode_datetime(bytes.fromhex(raw))
+
+    def test_timer(self):
+        self.assertEqual(list(self.plugin._decode_timer(bytes([0x30, 0x8b, 0xb8, 0x00]))), ['06:00', '17:30', '23:00', '00:00'])
+        # invalid minutes or hours
+        self.assertEqual(list(self.plugin._decode_timer(bytes([0x36, 0xc0, 0xff]))), ['00:00', '00:00', '00:00'])
+
+    def test_timer_roundtrip(self):
+        for hours in range(24):
+            for minutes in range(0, 60, 10):
+                switching_time = f'{hours:02d}:{minutes:02d}'
+                if switching_time != '00:00':
+                    self.assertEqual(list(self.plugin._decode_timer(bytes([self.plugin._encode_timer(switching_time)]))), [switching_time])
+
+    def test_error_entry(self):
+        self.assertEqual(self.plugin._decode_error_entry(bytes.fromhex('102024011501102030')), ('10', '2024-01-15T10:20:30'))
+        self.assertEqual(self.plugin._decode_error_entry(bytes.fromhex('000000000000000000')), ('00', None))
+
+
+@unittest.skipIf(Viessmann is None, 'SmartHomeNG not found')
+class TestBusBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = create_plugin()
+        self.commandcodes = sorted({commandconf['addr'].lower() for commandconf in self.plugin._commandset.values()})
+
+    def plan(self, cycles):
+        self.plugin._cyclic_cmds = {commandcode: {'cycle': cycle, 'nexttime': 0} for commandcode, cycle in zip(self.commandcodes, cycles)}
+        return self.plugin._plan_bus_budget(report=False)
+
+    def test_empty(self):
+        budget = self.plan([])
+        self.assertTrue(budget['feasible'])
+        self.assertEqual(budget['commands'], [])
+
+    def test_feasible(self):
+        budget = self.plan([60, 120, 300] * 4)
+        self.assertTrue(budget['feasible'])
+        self.assertEqual(budget['workercycle'], 30)
+        self.assertEqual(len(budget['burst']['commands']), 12)
+        self.assertLess(budget['utilization'], 100)
+        # the startup burst is not part of the steady state
+        self.assertTrue(all(cycle['time'] > 0 for cycle in budget['busiest']))
+        # all commands only coincide again at the end of the horizon, which is the startup pass
+        self.assertEqual(budget['horizon'], 600)
+        self.assertEqual(len(budget['busiest'][0]['commands']), 8)
+
+    def test_startup_burst(self):
+        # reading everything after startup takes longer than the worker cycle, but only once
+        budget = self.plan([2] + [3600] * 100)
+        self.assertGreater(budget['burst']['duration'], budget['workercycle'])
+        self.assertTrue(budget['feasible'])
+
+    def test_infeasible(self):
+        budget = self.plan([2] * 30 + [60] * 30)
+        self.assertFalse(budget['feasible'])
+        self.assertGreater(budget['utilization'], 100)
+        # commands with the highest load are removed first
+        infeasible = {entry['commandname'] for entry in budget['infeasible']}
+        cycles = {entry['commandname']: entry['cycle'] for entry in budget['commands']}
+        self.assertEqual({cycles[commandname] for commandname in infeasible}, {2})
+
+        # the remaining commands fit, one more of the removed commands would not
+        self.plugin._cyclic_cmds = {commandcode: entry for commandcode, entry in self.plugin._cyclic_cmds.items() if self.plugin._commandname_by_commandcode(commandcode) not in infeasible}
+        self.assertTrue(self.plugin._plan_bus_budget(report=False)['feasible'])
+        readded = next(commandcode for commandcode in self.commandcodes[:30] if self.plugin._commandname_by_commandcode(commandcode) in infeasible)
+        self.plugin._cyclic_cmds[readded] = {'cycle': 2, 'nexttime': 0}
+        self.assertFalse(self.plugin._plan_bus_budget(report=False)['feasible'])
+
+    def test_invalid_cycle(self):
+        budget = self.plan([0, -5, 60])
+        self.assertEqual(len(budget['commands']), 1)
+
+    def test_many_commands(self):
+        cycles = [2, 7, 11, 13, 17, 19, 23, 29]
+        budget = self.plan([cycles[index % len(cycles)] for index in range(len(self.commandcodes))])
+        self.assertEqual(budget['horizon'], 3600)
+        self.assertEqual(len(budget['commands']), len(self.commandcodes))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanner import AddressScanner  # noqa: E402
+
+
+class BlockDevice():
+    '''
+    Provides the parts of the plugin used by the scanner, reading from a memory map
+    '''
+
+    def __init__(self, mem, maxblock=64):
+        self.logger = logging.getLogger(__name__)
+        self.alive = True
+        self._cyclic_update_active = False
+        self.mem = mem
+        self.maxblock = maxblock
+        self.reads = []
+
+    def _read_block_checked(self, commandcode, length):
+        self.reads.append((int(commandcode, 16), length))
+        if length > self.maxblock:
+            return (None, True)
+        addr = int(commandcode, 16)
+        return (bytes(self.mem.get(addr + offset, 0) for offset in range(length)), False)
+
+
+class TestAddressScanner(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self._dir.name, 'scan.json')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_found(self):
+        device = BlockDevice({0x0802: 0x12, 0x0805: 0x34, 0x0806: 0xff, 0x0807: 0xff})
+        scanner = AddressScanner(device, self.filename, 0x0800, 0x080f, 2, 16, 1)
+        scanner.run()
+        status = scanner.status()
+        self.assertEqual(status['found'], {'0802': '1200', '0804': '0034'})
+        self.assertEqual(status['progress'], 100)
+        self.assertEqual(status['failed'], [])
+
+    def test_block_size(self):
+        device = BlockDevice({}, maxblock=4)
+        scanner = AddressScanner(device, self.filename, 0x0000, 0x00ff, 2, 16, 1)
+        scanner.run()
+        # rejected block lengths are not tried again
+        self.assertEqual([length for (addr, length) in device.reads[:4]], [16, 8, 4, 4])
+        self.assertTrue(all(length <= 4 for (addr, length) in device.reads[3:]))
+        self.assertEqual(scanner.status()['blocksize'], 4)
+
+    def test_block_size_recovers(self):
+        device = BlockDevice({})
+        scanner = AddressScanner(device, self.filename, 0x0000, 0x00ff, 2, 16, 1)
+        failed = {0x0000}
+
+        def read_block(commandcode, length):
+            # transient error on the first block
+            if int(commandcode, 16) in failed:
+                failed.clear()
+                return (None, False)
+            return BlockDevice._read_block_checked(device, commandcode, length)
+
+        device._read_block_checked = read_block
+        scanner.run()
+        self.assertEqual(scanner.status()['blocksize'], 16)
+
+    def test_resume(self):
+        device = BlockDevice({0x0010: 1, 0x0030: 2})
+        scanner = AddressScanner(device, self.filename, 0x0000, 0x003f, 2, 16, 1)
+        device.alive = False
+        scanner.run()
+        self.assertEqual(scanner.status()['next'], 0)
+
+        # stop after the first two blocks
+        reads = []
+
+        def read_block(commandcode, length):
+            reads.append(commandcode)
+            if len(reads) == 2:
+                device.alive = False
+            return BlockDevice._read_block_checked(device, commandcode, length)
+
+        device.alive = True
+        device._read_block_checked = read_block
+        scanner.run()
+        self.assertEqual(scanner.status()['next'], 0x0020)
+
+        device.alive = True
+        device._read_block_checked = lambda commandcode, length: BlockDevice._read_block_checked(device, commandcode, length)
+        scanner = AddressScanner(device, self.filename, 0x0000, 0x003f, 2, 16, 1)
+        self.assertEqual(scanner.status()['next'], 0x0020)
+        scanner.run()
+        self.assertEqual(scanner.status()['found'], {'0010': '0100', '0030': '0200'})
+
+        # a different range starts over
+        scanner = AddressScanner(device, self.filename, 0x0000, 0x007f, 2, 16, 1)
+        self.assertEqual(scanner.status()['next'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
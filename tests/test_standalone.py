@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# vim: set encoding=utf-8 tabstop=4 softtabstop=4 shiftwidth=4 expandtab
+
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standalone import ViessmannDaemon, write_dump  # noqa: E402
+
+
+class ReadPlugin():
+    '''
+    Provides the parts of the plugin used by the daemon
+    '''
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._protocol = 'P300'
+        self._default_maxage = 0
+        self._commandset = {'Aussentemperatur': {'addr': '0800', 'len': 2, 'unit': 'IS10', 'set': False}}
+        self._value_lock = threading.Lock()
+        self._cache_stats = {'hits': 0, 'misses': 0}
+        self.reads = 0
+        self.delay = 0
+
+    def read_addr(self, addr, force=False, maxage=None, timeout=None):
+        self.reads += 1
+        time.sleep(self.delay)
+        if addr == 'dead':
+            raise OSError('device gone')
+        return 21.5 if addr == '0800' else None
+
+    def get_metrics(self):
+        return {}
+
+
+class TestViessmannDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = ReadPlugin()
+        self.daemon = ViessmannDaemon(self.plugin, 'unix:/nonexistent', 5)
+
+    def request(self, request):
+        return self.daemon.handle_request(json.dumps(request).encode('utf-8'))
+
+    def test_read(self):
+        self.assertEqual(self.request({'cmd': 'read', 'addr': '0800', 'id': 7}), {'ok': True, 'id': 7, 'value': 21.5})
+        self.assertEqual(self.request({'cmd': 'read', 'name': 'Aussentemperatur'})['value'], 21.5)
+        self.assertEqual(self.plugin._default_maxage, 5)
+
+    def test_invalid_requests(self):
+        for line in (b'no json', b'[1, 2]'):
+            response = self.daemon.handle_request(line)
+            self.assertFalse(response['ok'])
+            self.assertTrue(response['error'].startswith('invalid request'))
+        for request in ({'cmd': 'unknown'}, {'cmd': 'read'}, {'cmd': 'read', 'name': 'unknown'}, {'cmd': 'read', 'addr': '0800', 'timeout': 'abc'}):
+            response = self.request(request)
+            self.assertFalse(response['ok'])
+            self.assertTrue(response['error'].startswith('invalid request'))
+
+    def test_failed_requests(self):
+        response = self.request({'cmd': 'read', 'addr': '0802'})
+        self.assertEqual(response['ok'], False)
+        self.assertEqual(response['error'], 'request failed')
+        response = self.request({'cmd': 'read', 'addr': 'dead'})
+        self.assertEqual(response['ok'], False)
+        self.assertEqual(response['error'], 'request failed: device gone')
+        status = self.request({'cmd': 'status'})['value']
+        self.assertEqual(status['daemon']['requests'], 3)
+        self.assertEqual(status['daemon']['errors'], 2)
+
+    def test_coalesced_reads(self):
+        self.plugin.delay = 0.2
+        responses = []
+        threads = [threading.Thread(target=lambda: responses.append(self.request({'cmd': 'read', 'addr': '0800'}))) for index in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([response['value'] for response in responses], [21.5] * 5)
+        self.assertEqual(self.plugin.reads, 1)
+        self.assertEqual(self.daemon.stats['coalesced'], 4)
+
+
+class TestWriteDump(unittest.TestCase):
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dump = {'time': '2024-01-15T10:20:30', 'port': '/dev/ttyUSB0', 'protocol': 'P300', 'type': 'V200KO1B', 'reads': [], 'errors': [],
+                     'values': {'Aussentemperatur': {'addr': '0800', 'len': 2, 'unit': 'IS10', 'value': 21.5, 'time': '2024-01-15T10:20:30', 'duration': 0.05},
+                                'Timer_M2_Mo': {'addr': '3000', 'len': 8, 'unit': 'CT', 'value': [{'An': '06:00', 'Aus': '22:00'}], 'time': '2024-01-15T10:20:30', 'duration': 0.06}}}
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_json(self):
+        filename = os.path.join(self._dir.name, 'dump.json')
+        write_dump(self.dump, filename)
+        with open(filename) as f:
+            self.assertEqual(json.load(f), self.dump)
+
+    def test_csv(self):
+        filename = os.path.join(self._dir.name, 'dump.csv')
+        write_dump(self.dump, filename, 'csv')
+        with open(filename, newline='') as f:
+            rows = list(csv.reader(f, delimiter=';'))
+        self.assertEqual(rows[0], ['command', 'addr', 'len', 'unit', 'value', 'time', 'read_ms'])
+        self.assertEqual(rows[1], ['Aussentemperatur', '0800', '2', 'IS10', '21.5', '2024-01-15T10:20:30', '50.0'])
+        self.assertEqual(json.loads(rows[2][4]), [{'An': '06:00', 'Aus': '22:00'}])
+
+
+if __name__ == '__main__':
+    unittest.main()